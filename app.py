@@ -1,12 +1,21 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
+from streamlit.errors import StreamlitAPIException
 from datetime import datetime, timedelta
+import os
 import time
+import functools
+import uuid
 import base64
 from io import BytesIO
+from utils.job_queue import AnalysisJobQueue, QueueFullError
+from utils.mood_stats import MoodAggregates
+from utils.session_store import SessionStateManager
+from utils import instrumentation
+from utils.instrumentation import span
+from utils.resources import get_data_manager, get_text_analyzer
+
+JOURNAL_PAGE_SIZE = 5  # journal entries shown per page
+JOURNAL_SEARCH_LIMIT = 10  # best search matches shown
 
 # Configure page
 st.set_page_config(
@@ -65,15 +74,162 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Heavy libraries (pandas, numpy, plotly, librosa, textblob) are imported
+# inside the functions and tabs that use them to keep cold start fast.
+
 # Initialize session state
-if 'mood_history' not in st.session_state:
-    st.session_state.mood_history = []
+if 'session_key' not in st.session_state:
+    st.session_state.session_key = uuid.uuid4().hex
 if 'is_recording' not in st.session_state:
     st.session_state.is_recording = False
 if 'current_mood' not in st.session_state:
     st.session_state.current_mood = "Neutral"
 if 'mood_score' not in st.session_state:
     st.session_state.mood_score = 5
+if 'voice_job_id' not in st.session_state:
+    st.session_state.voice_job_id = None
+if 'voice_job_error' not in st.session_state:
+    st.session_state.voice_job_error = ""
+
+@st.cache_resource
+def get_job_queue():
+    """Worker pool shared by all sessions in this server process"""
+    return AnalysisJobQueue(max_workers=4, max_pending=16)
+
+@st.cache_resource
+def get_inference_client():
+    """Pooled client for the shared inference service, if MINDVOICE_INFERENCE_URL is set"""
+    base_url = os.environ.get("MINDVOICE_INFERENCE_URL")
+    if not base_url:
+        return None
+    from utils.inference_client import InferenceClient
+    return InferenceClient(base_url)
+
+@st.cache_resource
+def get_session_store():
+    """Holds every session's histories under one memory budget, spilling idle ones to disk"""
+    storage = get_storage()
+    store = SessionStateManager(
+        storage,
+        memory_budget_bytes=int(os.environ.get("MINDVOICE_SESSION_BUDGET_MB", "256")) * 2**20,
+        idle_seconds=int(os.environ.get("MINDVOICE_SESSION_IDLE_SECONDS", "900")),
+        # Anonymous journals are keyed by the session, so they end with it
+        on_expire=storage.delete_session_journal
+    )
+    storage.purge_stale_files(store.expire_seconds)
+    return store
+
+if 'mood_history_version' not in st.session_state:
+    st.session_state.mood_history_version = 0
+if 'cpu_times' not in st.session_state:
+    st.session_state.cpu_times = {}
+
+# Show any message queued before the last full rerun
+if st.session_state.get('flash_message'):
+    st.toast(st.session_state.pop('flash_message'))
+
+# Partial reruns: st.fragment (Streamlit >= 1.37) reruns only the decorated
+# function when one of its widgets changes. Older versions rerun the app.
+_st_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def fragment(func):
+    """Run func as an independently rerunning fragment and record its CPU time"""
+    @functools.wraps(func)
+    def wrapper():
+        start = time.thread_time()
+        try:
+            with span(f"app.{func.__name__}"):
+                return func()
+        finally:
+            elapsed_ms = (time.thread_time() - start) * 1000
+            st.session_state.cpu_times[func.__name__] = elapsed_ms
+    return _st_fragment(wrapper) if _st_fragment else wrapper
+
+def rerun_fragment():
+    """Rerun only the calling fragment, or the whole app if unsupported"""
+    if _st_fragment:
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            # Fragment-scoped reruns are only allowed during a fragment rerun
+            pass
+    st.rerun()
+
+def rerun_app(message=None):
+    """Rerun every section after shared data changed, keeping a message for the user"""
+    if message:
+        st.session_state.flash_message = message
+    st.rerun()
+
+# Shared state accessors
+def get_storage():
+    """DataManager holding journals and spilled sessions, shared by all sessions"""
+    return get_data_manager(os.environ.get("MINDVOICE_DATA_DIR", "data"))
+
+def new_session_data():
+    """Initial histories for a new session"""
+    return {
+        'mood_history': [],
+        'mood_stats': MoodAggregates(),
+        'voice_analysis': None
+    }
+
+def get_session_data():
+    """This session's histories, rehydrated from disk if they were spilled"""
+    return get_session_store().get(st.session_state.session_key, new_session_data)
+
+def session_data_changed(*added):
+    """Tell the session store this session's histories grew by the added objects"""
+    get_session_store().mark_dirty(st.session_state.session_key, *added)
+
+def get_mood_history():
+    """Mood entries for this session, oldest first"""
+    return get_session_data()['mood_history']
+
+def get_mood_stats():
+    """Running aggregates over the mood history"""
+    return get_session_data()['mood_stats']
+
+def get_user_id():
+    """Storage key for this session's journal.
+    
+    There is no authentication yet, so identity is never taken from the
+    request: the key is derived from the server-generated session key, and
+    the journal is deleted when the session expires.
+    """
+    return get_storage().session_user_id(st.session_state.session_key)
+
+def get_journal_index():
+    """Search index over the user's journal, loaded on first search.
+    
+    Kept as a derived cache in the session's data, so it counts towards
+    the memory budget and is dropped when the session is spilled.
+    """
+    session_data = get_session_data()
+    journal_index = session_data.get('_journal_index')
+    if journal_index is None:
+        journal_index = session_data['_journal_index'] = get_storage().load_journal_index(get_user_id())
+        session_data_changed(journal_index)
+    return journal_index
+
+def get_mood_dataframe():
+    """DataFrame of the mood history, rebuilt only when the history changed.
+    
+    The frame is shared between reruns, so callers must not modify it in place.
+    """
+    session_data = get_session_data()
+    cached = session_data.get('_mood_dataframe')
+    if cached is None or cached[0] != st.session_state.mood_history_version:
+        import pandas as pd
+        
+        with span("app.mood_dataframe"):
+            df = pd.DataFrame(get_mood_history())
+            df['date'] = df['timestamp'].dt.date
+            df['time'] = df['timestamp'].dt.strftime('%H:%M')
+            df['hour'] = df['timestamp'].dt.hour
+        cached = (st.session_state.mood_history_version, df)
+        session_data['_mood_dataframe'] = cached
+    return cached[1]
 
 # Helper functions
 def add_mood_entry(mood, score, notes="", voice_analysis=""):
@@ -84,7 +240,10 @@ def add_mood_entry(mood, score, notes="", voice_analysis=""):
         'notes': notes,
         'voice_analysis': voice_analysis
     }
-    st.session_state.mood_history.append(entry)
+    get_mood_history().append(entry)
+    get_mood_stats().add(entry)
+    st.session_state.mood_history_version += 1
+    session_data_changed(entry)
 
 def get_mood_emoji(mood):
     mood_emojis = {
@@ -102,6 +261,8 @@ def get_mood_emoji(mood):
 
 def simulate_voice_analysis():
     """Simulate voice mood analysis"""
+    import numpy as np
+    
     moods = ["Happy", "Sad", "Anxious", "Calm", "Excited", "Neutral"]
     confidence = np.random.uniform(75, 95)
     detected_mood = np.random.choice(moods)
@@ -117,11 +278,26 @@ def simulate_voice_analysis():
     }
     return analysis
 
-# Main App Header
-st.markdown('<h1 class="main-header">🧠 MindCare - Mental Health Support</h1>', unsafe_allow_html=True)
+def analyze_text_mood(text):
+    """Text mood via the inference service, or the in-process analyzer without one"""
+    client = get_inference_client()
+    if client is not None:
+        from utils.inference_client import InferenceError
+        try:
+            return client.analyze_text(text)
+        except InferenceError as e:
+            print(f"Inference service failed, analyzing locally: {e}")
+    return get_text_analyzer().analyze_text_mood(text)
 
-# Sidebar for quick actions
-with st.sidebar:
+def run_voice_analysis():
+    """Background job: analyze a finished recording"""
+    # Simulated processing time of the real analyzer
+    time.sleep(2)
+    return simulate_voice_analysis()
+
+@fragment
+def render_sidebar():
+    """Sidebar with current mood, quick logging and stats"""
     st.markdown("### 🎯 Quick Actions")
     
     # Current mood display
@@ -139,31 +315,60 @@ with st.sidebar:
     with col1:
         if st.button("😊 Good"):
             add_mood_entry("Happy", 7, "Quick log - feeling good")
-            st.success("Mood logged!")
+            rerun_app("Mood logged!")
     with col2:
         if st.button("😢 Down"):
             add_mood_entry("Sad", 3, "Quick log - feeling down")
-            st.success("Mood logged!")
+            rerun_app("Mood logged!")
     
     # Statistics
-    if st.session_state.mood_history:
+    mood_stats = get_mood_stats()
+    if mood_stats.count:
         st.markdown("### 📊 Quick Stats")
-        avg_score = np.mean([entry['score'] for entry in st.session_state.mood_history])
-        st.metric("Average Mood", f"{avg_score:.1f}/10")
-        st.metric("Entries Today", len([e for e in st.session_state.mood_history 
-                                      if e['timestamp'].date() == datetime.now().date()]))
+        st.metric("Average Mood", f"{mood_stats.average_score:.1f}/10")
+        st.metric("Entries Today", mood_stats.entries_on(datetime.now().date()))
+    
+    if instrumentation.is_enabled():
+        # Server CPU time of the last run of each section
+        if st.session_state.cpu_times:
+            with st.expander("⏱️ Server time per section"):
+                for section, cpu_ms in st.session_state.cpu_times.items():
+                    st.caption(f"{section}: {cpu_ms:.1f} ms CPU")
+        render_debug_panel()
 
-# Main content tabs
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "🎙️ Voice Mood Detection", 
-    "📊 Mood Analyzer", 
-    "📈 Mood Tracker", 
-    "📝 Journal", 
-    "🏥 Resources"
-])
+def render_debug_panel():
+    """Stage timings collected by utils.instrumentation (MINDVOICE_PROFILE=1)"""
+    with st.expander("🛠️ Performance (debug)"):
+        stage_stats = instrumentation.stats()
+        if not stage_stats:
+            st.caption("No stages recorded yet.")
+            return
+        
+        st.dataframe(
+            [{'stage': name, 'count': s['count'], 'p50 ms': round(s['p50_ms'], 2),
+              'p95 ms': round(s['p95_ms'], 2), 'max ms': round(s['max_ms'], 2), 'errors': s['errors']}
+             for name, s in stage_stats.items()],
+            hide_index=True
+        )
+        
+        session_stats = get_session_store().stats()
+        st.caption(f"Sessions: {session_stats['resident_sessions']} resident "
+                   f"({session_stats['resident_bytes'] / 2**20:.1f} MB), "
+                   f"{session_stats['spilled_sessions']} spilled "
+                   f"({session_stats['spilled_bytes'] / 2**20:.1f} MB)")
+        
+        if st.button("💾 Export metrics", key="export_metrics"):
+            metrics_dir = os.environ.get("MINDVOICE_METRICS_DIR", os.path.join("data", "metrics"))
+            json_path, prom_path = instrumentation.export(metrics_dir)
+            st.caption(f"Wrote {json_path} and {prom_path}")
+        st.download_button("📥 Prometheus text", instrumentation.to_prometheus(),
+                           file_name="metrics.prom", mime="text/plain")
+        if st.button("Reset timings", key="reset_metrics"):
+            instrumentation.reset()
 
-# Tab 1: Voice Mood Detection
-with tab1:
+@fragment
+def render_voice_tab():
+    """Tab 1: Voice Mood Detection"""
     st.markdown('<h2 class="tab-header">🎙️ Voice Mood Detection</h2>', unsafe_allow_html=True)
     
     col1, col2 = st.columns([2, 1])
@@ -178,16 +383,43 @@ with tab1:
             if not st.session_state.is_recording:
                 if st.button("🎤 Start Recording", key="start_record"):
                     st.session_state.is_recording = True
-                    st.rerun()
+                    st.session_state.voice_job_error = ""
+                    rerun_fragment()
             else:
                 if st.button("⏹️ Stop Recording", key="stop_record"):
                     st.session_state.is_recording = False
-                    # Simulate analysis
-                    with st.spinner("Analyzing your voice..."):
-                        time.sleep(2)
-                        analysis = simulate_voice_analysis()
-                        st.session_state.voice_analysis = analysis
-                    st.rerun()
+                    # Hand analysis off to the shared pool and poll for the result
+                    try:
+                        st.session_state.voice_job_id = get_job_queue().submit(run_voice_analysis)
+                        st.session_state.voice_job_error = ""
+                    except QueueFullError:
+                        st.session_state.voice_job_error = "The analyzer is busy right now. Please record again in a moment."
+                    rerun_fragment()
+        
+        # Pending analysis status
+        if st.session_state.voice_job_id:
+            job_queue = get_job_queue()
+            job_status = job_queue.status(st.session_state.voice_job_id)
+            if job_status in ("queued", "running"):
+                st.info("⏳ Analyzing your voice..." if job_status == "running" else "⏳ Waiting for a free analyzer...")
+                time.sleep(0.5)
+                rerun_fragment()
+            elif job_status == "done":
+                voice_result = job_queue.pop_result(st.session_state.voice_job_id)
+                get_session_data()['voice_analysis'] = voice_result
+                session_data_changed(voice_result)
+                st.session_state.voice_job_id = None
+            else:
+                if job_status == "failed":
+                    try:
+                        job_queue.pop_result(st.session_state.voice_job_id)
+                    except Exception as e:
+                        print(f"Error in voice analysis job: {e}")
+                st.session_state.voice_job_id = None
+                st.session_state.voice_job_error = "Voice analysis failed. Please try recording again."
+        
+        if st.session_state.voice_job_error:
+            st.error(st.session_state.voice_job_error)
         
         # Recording status
         if st.session_state.is_recording:
@@ -210,10 +442,10 @@ with tab1:
         """)
     
     # Display analysis results
-    if hasattr(st.session_state, 'voice_analysis') and st.session_state.voice_analysis:
+    analysis = get_session_data()['voice_analysis']
+    if analysis:
         st.markdown("### 🔍 Voice Analysis Results")
-        
-        analysis = st.session_state.voice_analysis
+        import numpy as np
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -265,10 +497,11 @@ with tab1:
                     notes, 
                     f"Voice analysis - {analysis['confidence']:.1f}% confidence"
                 )
-                st.success("Analysis saved to your mood history!")
+                rerun_app("Analysis saved to your mood history!")
 
-# Tab 2: Mood Analyzer
-with tab2:
+@fragment
+def render_mood_analyzer_tab():
+    """Tab 2: Mood Analyzer"""
     st.markdown('<h2 class="tab-header">📊 Mood Analyzer</h2>', unsafe_allow_html=True)
     
     col1, col2 = st.columns([2, 1])
@@ -315,7 +548,7 @@ with tab2:
             # Save to history
             add_mood_entry(selected_mood, mood_intensity, detailed_notes)
             
-            st.success("Mood analysis saved successfully!")
+            rerun_app("Mood analysis saved successfully!")
     
     with col2:
         st.markdown("### 🎯 Mood Insights")
@@ -337,15 +570,16 @@ with tab2:
         else:
             st.info("😌 **Neutral mood suggestions:**\n- Try a new activity\n- Practice mindfulness\n- Connect with others\n- Set small goals")
 
-# Tab 3: Mood Tracker
-with tab3:
+@fragment
+def render_tracker_tab():
+    """Tab 3: Mood Tracker"""
     st.markdown('<h2 class="tab-header">📈 Mood Tracker</h2>', unsafe_allow_html=True)
     
-    if st.session_state.mood_history:
-        # Create dataframe from mood history
-        df = pd.DataFrame(st.session_state.mood_history)
-        df['date'] = df['timestamp'].dt.date
-        df['time'] = df['timestamp'].dt.strftime('%H:%M')
+    if get_mood_history():
+        import plotly.express as px
+        
+        # Cached dataframe of the mood history
+        df = get_mood_dataframe()
         
         # Summary metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -369,30 +603,32 @@ with tab3:
         daily_mood = df.groupby('date')['score'].agg(['mean', 'count']).reset_index()
         daily_mood.columns = ['date', 'avg_score', 'entry_count']
         
-        fig = px.line(daily_mood, x='date', y='avg_score', 
-                     title='Daily Average Mood Score',
-                     labels={'avg_score': 'Average Mood Score', 'date': 'Date'})
-        fig.update_traces(line_color='#4A90E2', line_width=3)
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        with span("app.plotly.trend_chart"):
+            fig = px.line(daily_mood, x='date', y='avg_score', 
+                         title='Daily Average Mood Score',
+                         labels={'avg_score': 'Average Mood Score', 'date': 'Date'})
+            fig.update_traces(line_color='#4A90E2', line_width=3)
+            fig.update_layout(height=400)
+            st.plotly_chart(fig, use_container_width=True)
         
         # Mood distribution
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("### 🎭 Mood Distribution")
             mood_counts = df['mood'].value_counts()
-            fig_pie = px.pie(values=mood_counts.values, names=mood_counts.index,
-                           title="Distribution of Recorded Moods")
-            st.plotly_chart(fig_pie, use_container_width=True)
+            with span("app.plotly.distribution_chart"):
+                fig_pie = px.pie(values=mood_counts.values, names=mood_counts.index,
+                               title="Distribution of Recorded Moods")
+                st.plotly_chart(fig_pie, use_container_width=True)
         
         with col2:
             st.markdown("### ⏰ Mood by Time of Day")
-            df['hour'] = df['timestamp'].dt.hour
             hourly_mood = df.groupby('hour')['score'].mean().reset_index()
-            fig_bar = px.bar(hourly_mood, x='hour', y='score',
-                           title="Average Mood Score by Hour",
-                           labels={'hour': 'Hour of Day', 'score': 'Average Mood Score'})
-            st.plotly_chart(fig_bar, use_container_width=True)
+            with span("app.plotly.hourly_chart"):
+                fig_bar = px.bar(hourly_mood, x='hour', y='score',
+                               title="Average Mood Score by Hour",
+                               labels={'hour': 'Hour of Day', 'score': 'Average Mood Score'})
+                st.plotly_chart(fig_bar, use_container_width=True)
         
         # Recent entries table
         st.markdown("### 📋 Recent Mood Entries")
@@ -415,10 +651,13 @@ with tab3:
         
         # Sample data button for demonstration
         if st.button("📊 Load Sample Data (Demo)"):
+            import numpy as np
+            
             # Generate sample mood data
             sample_dates = [datetime.now() - timedelta(days=x) for x in range(30, 0, -1)]
             sample_moods = ["Happy", "Sad", "Neutral", "Anxious", "Excited", "Calm"]
             
+            sample_entries = []
             for date in sample_dates:
                 if np.random.random() > 0.3:  # 70% chance of entry per day
                     mood = np.random.choice(sample_moods)
@@ -432,13 +671,26 @@ with tab3:
                         'notes': notes,
                         'voice_analysis': ""
                     }
-                    st.session_state.mood_history.append(entry)
+                    get_mood_history().append(entry)
+                    get_mood_stats().add(entry)
+                    sample_entries.append(entry)
+            st.session_state.mood_history_version += 1
+            session_data_changed(sample_entries)
             
-            st.success("Sample data loaded! Refresh to see your mood tracker.")
-            st.rerun()
+            rerun_app("Sample data loaded!")
 
-# Tab 4: Journal
-with tab4:
+def render_journal_entry(entry):
+    """Collapsible view of one journal entry"""
+    with st.expander(f"{entry['title']} - {entry['date'].strftime('%Y-%m-%d %H:%M')}"):
+        st.write(entry['content'])
+        if entry.get('mood'):
+            st.caption(f"Detected mood: {get_mood_emoji(entry['mood'])} {entry['mood']}")
+        if entry['tags']:
+            st.write(f"**Tags:** {', '.join(entry['tags'])}")
+
+@fragment
+def render_journal_tab():
+    """Tab 4: Journal"""
     st.markdown('<h2 class="tab-header">📝 Digital Journal</h2>', unsafe_allow_html=True)
     
     # Journal entry form
@@ -467,46 +719,85 @@ with tab4:
             st.write(f"💭 *{selected_prompt}*")
     
     # Tags for categorization
-    journal_tags = st.multiselect(
-        "Add tags (optional):",
-        ["Work", "Relationships", "Health", "Goals", "Gratitude", "Challenges", "Success", "Learning", "Travel", "Family"]
-    )
+    tag_options = ["Work", "Relationships", "Health", "Goals", "Gratitude", "Challenges", "Success", "Learning", "Travel", "Family"]
+    journal_tags = st.multiselect("Add tags (optional):", tag_options)
     
     if st.button("💾 Save Journal Entry"):
         if journal_content.strip():
+            now = datetime.now()
+            text_mood = analyze_text_mood(f"{journal_title} {journal_content}")
             entry = {
-                'timestamp': datetime.now(),
-                'title': journal_title or f"Journal Entry - {datetime.now().strftime('%Y-%m-%d')}",
+                'id': int(now.timestamp() * 1_000_000),
+                'date': now,
+                'title': journal_title or f"Journal Entry - {now.strftime('%Y-%m-%d')}",
                 'content': journal_content,
-                'tags': journal_tags
+                'tags': journal_tags,
+                'mood': text_mood['mood']
             }
             
-            # Initialize journal entries if not exists
-            if 'journal_entries' not in st.session_state:
-                st.session_state.journal_entries = []
+            offset = get_storage().save_journal_entry(get_user_id(), entry)
+            session_data = get_session_data()
+            if session_data.get('_journal_index') is not None:
+                if offset is None:
+                    # A back-dated entry moved the others; reload the index on the next search
+                    del session_data['_journal_index']
+                else:
+                    session_data['_journal_index'].add_entry(entry['id'], entry, offset)
+                    session_data_changed(entry)
             
-            st.session_state.journal_entries.append(entry)
+            # Show the newest page so the new entry is visible
+            st.session_state.journal_cursors = [None]
             st.success("Journal entry saved!")
         else:
             st.error("Please write something before saving.")
     
-    # Display previous entries
-    if hasattr(st.session_state, 'journal_entries') and st.session_state.journal_entries:
+    # Display previous entries, one page at a time
+    if 'journal_cursors' not in st.session_state:
+        st.session_state.journal_cursors = [None]
+    cursors = st.session_state.journal_cursors
+    page_entries, next_cursor = get_storage().load_journal_page(get_user_id(), cursors[-1], JOURNAL_PAGE_SIZE)
+    
+    if page_entries:
         st.markdown("### 📖 Previous Entries")
         
-        # Sort entries by date (newest first)
-        sorted_entries = sorted(st.session_state.journal_entries, key=lambda x: x['timestamp'], reverse=True)
-        
-        for i, entry in enumerate(sorted_entries[:5]):  # Show last 5 entries
-            with st.expander(f"{entry['title']} - {entry['timestamp'].strftime('%Y-%m-%d %H:%M')}"):
-                st.write(entry['content'])
-                if entry['tags']:
-                    st.write(f"**Tags:** {', '.join(entry['tags'])}")
+        # Search by keywords and/or tags
+        search_col1, search_col2 = st.columns([2, 1])
+        with search_col1:
+            search_query = st.text_input("🔍 Search entries", placeholder="Keywords from a title or entry...")
+        with search_col2:
+            search_tags = st.multiselect("Filter by tags", tag_options)
+        
+        if search_query.strip() or search_tags:
+            journal_index = get_journal_index()
+            results = journal_index.search(search_query, search_tags, limit=JOURNAL_SEARCH_LIMIT)
+            if len(results) < JOURNAL_SEARCH_LIMIT:
+                st.caption(f"{len(results)} matching entries")
+            else:
+                st.caption(f"Top {JOURNAL_SEARCH_LIMIT} matches")
+            hits = [entry_id for entry_id, _ in results]
+            for entry in get_storage().load_journal_entries_by_ids(get_user_id(), hits, journal_index.offsets):
+                render_journal_entry(entry)
+        else:
+            for entry in page_entries:
+                render_journal_entry(entry)
+            
+            nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+            with nav_col1:
+                if len(cursors) > 1 and st.button("⬅️ Newer", key="journal_newer"):
+                    cursors.pop()
+                    rerun_fragment()
+            with nav_col2:
+                st.caption(f"Page {len(cursors)}")
+            with nav_col3:
+                if next_cursor is not None and st.button("Older ➡️", key="journal_older"):
+                    cursors.append(next_cursor)
+                    rerun_fragment()
     else:
         st.info("No journal entries yet. Start writing your first entry above!")
 
-# Tab 5: Resources
-with tab5:
+@fragment
+def render_resources_tab():
+    """Tab 5: Resources"""
     st.markdown('<h2 class="tab-header">🏥 Mental Health Resources</h2>', unsafe_allow_html=True)
     
     # Emergency contacts
@@ -635,6 +926,36 @@ with tab5:
         for strategy in coping_strategies[selected_strategy]:
             st.write(f"• {strategy}")
 
+# Spill idle sessions' histories to disk when over the memory budget
+get_session_store().maybe_enforce()
+
+# Main App Header
+st.markdown('<h1 class="main-header">🧠 MindCare - Mental Health Support</h1>', unsafe_allow_html=True)
+
+# Each section is a fragment, so interacting with a widget reruns only the
+# section it belongs to. Changes to shared data trigger a full rerun.
+with st.sidebar:
+    render_sidebar()
+
+# Main content tabs
+tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    "🎙️ Voice Mood Detection", 
+    "📊 Mood Analyzer", 
+    "📈 Mood Tracker", 
+    "📝 Journal", 
+    "🏥 Resources"
+])
+with tab1:
+    render_voice_tab()
+with tab2:
+    render_mood_analyzer_tab()
+with tab3:
+    render_tracker_tab()
+with tab4:
+    render_journal_tab()
+with tab5:
+    render_resources_tab()
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,135 @@
+"""Deterministic synthetic data for the benchmarks.
+
+Every generator takes a seed, so two runs with the same arguments produce
+identical data and their timings can be compared.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+SAMPLE_RATE = 22050
+MOODS = ["Very Happy", "Happy", "Neutral", "Sad", "Very Sad", "Anxious", "Angry", "Excited", "Calm"]
+JOURNAL_TAGS = ["Work", "Relationships", "Health", "Goals", "Gratitude", "Challenges", "Success", "Learning", "Travel", "Family"]
+
+# Fixed reference time so generated timestamps don't depend on when the run starts
+EPOCH = datetime(2024, 1, 1, 8, 0, 0)
+
+_FILLER_WORDS = [
+    "today", "work", "meeting", "friend", "family", "walk", "coffee", "morning", "evening",
+    "felt", "really", "quite", "little", "after", "before", "home", "weekend", "project",
+    "call", "dinner", "sleep", "week", "plan", "talked", "thought", "about", "long", "day"
+]
+_EMOTION_WORDS = [
+    "happy", "great", "love", "sad", "down", "tired", "exhausted", "anxious", "worried",
+    "stress", "calm", "relaxed", "peaceful", "angry", "frustrated", "excited", "wonderful"
+]
+
+
+def tone(duration, freq=220.0, sample_rate=SAMPLE_RATE, seed=0):
+    """Pure sine tone with a random phase"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    return (0.5 * np.sin(2 * np.pi * freq * t + rng.uniform(0, 2 * np.pi))).astype(np.float32)
+
+
+def noise(duration, sample_rate=SAMPLE_RATE, seed=0):
+    """White noise"""
+    rng = np.random.default_rng(seed)
+    return (0.3 * rng.standard_normal(int(duration * sample_rate))).astype(np.float32)
+
+
+def speech_like(duration, sample_rate=SAMPLE_RATE, seed=0):
+    """Harmonic voice-like signal with syllable-rate envelope and pauses"""
+    rng = np.random.default_rng(seed)
+    n = int(duration * sample_rate)
+    t = np.arange(n) / sample_rate
+
+    # Slowly wandering fundamental around a speaking pitch
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.3 * t) + 10 * rng.standard_normal() * np.sin(2 * np.pi * 1.1 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    signal = sum(np.sin(k * phase) / k for k in range(1, 6))
+
+    # ~4 syllables per second, with a pause every few words
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 2
+    pauses = (np.sin(2 * np.pi * 0.4 * t + rng.uniform(0, np.pi)) > -0.6).astype(float)
+    signal = signal * envelope * pauses + 0.01 * rng.standard_normal(n)
+    return (0.3 * signal / max(np.max(np.abs(signal)), 1e-9)).astype(np.float32)
+
+
+AUDIO_GENERATORS = {'tone': tone, 'noise': noise, 'speech_like': speech_like}
+
+
+def journal_text(words=80, seed=0, emotion_ratio=0.08):
+    """One journal-style paragraph mixing filler and emotion words"""
+    rng = np.random.default_rng(seed)
+    picks = []
+    for _ in range(words):
+        pool = _EMOTION_WORDS if rng.random() < emotion_ratio else _FILLER_WORDS
+        picks.append(pool[rng.integers(len(pool))])
+    sentences = [" ".join(picks[i:i + 12]).capitalize() + "." for i in range(0, len(picks), 12)]
+    return " ".join(sentences)
+
+
+def journal_entries(count, words=80, seed=0):
+    """Journal entries in the app's format, one every ~8 hours"""
+    rng = np.random.default_rng(seed)
+    entries = []
+    for i in range(count):
+        timestamp = EPOCH + timedelta(hours=8 * i, minutes=int(rng.integers(0, 60)))
+        entries.append({
+            'id': i,
+            'timestamp': timestamp,
+            'date': timestamp,
+            'title': f"Journal Entry - {timestamp.strftime('%Y-%m-%d')}",
+            'content': journal_text(words, seed=seed * 1_000_003 + i),
+            'tags': [JOURNAL_TAGS[j] for j in rng.choice(len(JOURNAL_TAGS), size=2, replace=False)],
+            'mood_rating': int(rng.integers(1, 11))
+        })
+    return entries
+
+
+def mood_history(count, seed=0):
+    """Mood entries in the app's format, a few per day, oldest first.
+
+    Entries carry both 'timestamp' (session state) and 'date' (DataManager).
+    Built with vectorized draws so a million entries take seconds.
+    """
+    rng = np.random.default_rng(seed)
+    offsets = np.sort(rng.integers(0, max(count, 1) * 6 * 3600, size=count))
+    moods = rng.integers(0, len(MOODS), size=count)
+    scores = rng.integers(1, 11, size=count)
+    entries = []
+    for offset, mood, score in zip(offsets.tolist(), moods.tolist(), scores.tolist()):
+        timestamp = EPOCH + timedelta(seconds=offset)
+        entries.append({
+            'timestamp': timestamp,
+            'date': timestamp,
+            'mood': MOODS[mood],
+            'score': score,
+            'notes': "",
+            'voice_analysis': ""
+        })
+    return entries
+
+
+def cohort_history(users, days=28, active_share=0.6, seed=0):
+    """{user_id: mood entries} as stored by DataManager, at most one entry per user-day.
+
+    Each user logs on about active_share of the days; scores drift per
+    user so some cohorts trend up and others down.
+    """
+    rng = np.random.default_rng(seed)
+    active = rng.random((users, days)) < active_share
+    drift = rng.normal(0, 0.15, size=(users, 1))
+    scores = np.clip(np.rint(5.5 + rng.normal(0, 1.5, size=(users, days)) + drift * np.arange(days)), 1, 10)
+    moods = rng.integers(0, len(MOODS), size=(users, days))
+    day_strings = [(EPOCH + timedelta(days=day)).isoformat() for day in range(days)]
+
+    history = {}
+    for user in range(users):
+        history[f"user_{user:06d}"] = [
+            {'date': day_strings[day], 'mood': MOODS[moods[user, day]], 'score': int(scores[user, day]),
+             'notes': "", 'voice_analysis': ""}
+            for day in np.flatnonzero(active[user]).tolist()
+        ]
+    return history
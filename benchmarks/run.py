@@ -0,0 +1,274 @@
+"""Component micro-benchmarks.
+
+Times the analyzers, multimodal fusion, insights, DataManager and the
+cohort rollup queries on deterministic synthetic data and writes
+machine-readable JSON. A run can be checked against an earlier one;
+benchmarks whose median got slower than the threshold are flagged and
+the exit code is 1.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --sizes 1000,10000,100000,1000000 --output big.json
+    python -m benchmarks.run --baseline bench.json --threshold 0.2
+    python -m benchmarks.run --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import generators
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_USERS = [10_000]
+COHORT_DAYS = 28
+AUDIO_SECONDS = [1, 5, 30]
+TEXT_WORDS = [50, 500, 5_000]
+
+
+def measure(fn, repeats=5, warmup=1):
+    """Run fn repeatedly and return timing stats in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'median_ms': statistics.median(samples),
+        'min_ms': samples[0],
+        'max_ms': samples[-1],
+        'repeats': repeats
+    }
+
+
+def bench_audio(repeats):
+    """AudioMoodAnalyzer.extract_features on tones, noise and speech-like clips"""
+    from utils.audio_processing import AudioMoodAnalyzer
+    analyzer = AudioMoodAnalyzer()
+    for kind, generate in generators.AUDIO_GENERATORS.items():
+        for seconds in AUDIO_SECONDS:
+            clip = generate(seconds, seed=seconds)
+            yield (f"audio.extract_features[{kind},{seconds}s]",
+                   {'kind': kind, 'seconds': seconds},
+                   lambda clip=clip: analyzer.extract_features(clip, generators.SAMPLE_RATE),
+                   max(1, repeats // 2) if seconds >= 30 else repeats)
+
+
+def bench_text(repeats):
+    """TextMoodAnalyzer.analyze_text_mood on journal texts of several lengths"""
+    from utils.mood_analysis import TextMoodAnalyzer
+    analyzer = TextMoodAnalyzer()
+    for words in TEXT_WORDS:
+        text = generators.journal_text(words, seed=words)
+        yield (f"text.analyze_text_mood[{words}w]", {'words': words},
+               lambda text=text: analyzer.analyze_text_mood(text), repeats)
+
+
+def bench_multimodal(repeats):
+    """MultimodalMoodAnalyzer.analyze against running the two analyzers back to back"""
+    from utils.resources import get_multimodal_analyzer
+    analyzer = get_multimodal_analyzer()
+    for seconds, words in [(5, 500), (30, 5_000)]:
+        clip = generators.speech_like(seconds, seed=seconds)
+        text = generators.journal_text(words, seed=words)
+        params = {'seconds': seconds, 'words': words}
+        case_repeats = max(1, repeats // 2) if seconds >= 30 else repeats
+
+        def sequential(clip=clip, text=text):
+            analyzer.audio_analyzer.predict_mood_from_signal(clip, generators.SAMPLE_RATE)
+            analyzer.text_analyzer.analyze_text_mood(text)
+
+        yield (f"multimodal.sequential[{seconds}s,{words}w]", params, sequential, case_repeats)
+        yield (f"multimodal.analyze[{seconds}s,{words}w]", params,
+               lambda clip=clip, text=text: analyzer.analyze(clip, text, generators.SAMPLE_RATE), case_repeats)
+
+
+def bench_insights(repeats, sizes):
+    """MoodInsights.generate_insights over growing histories"""
+    from utils.mood_analysis import MoodInsights
+    journal = generators.journal_entries(200, words=20)
+    for size in sizes:
+        history = generators.mood_history(size, seed=size)
+        yield (f"insights.generate_insights[{size}]", {'entries': size},
+               lambda history=history: MoodInsights.generate_insights(history, journal),
+               repeats if size <= 100_000 else 1)
+
+
+def bench_data_manager(repeats, sizes, workdir):
+    """DataManager save/load/export with a user history of each size"""
+    from utils.data_manager import DataManager
+    for size in sizes:
+        data_dir = os.path.join(workdir, f"dm_{size}")
+        manager = DataManager(data_dir)
+        history = generators.mood_history(size, seed=size)
+        for entry in history:
+            entry['date'] = entry['date'].isoformat()
+            del entry['timestamp']
+        manager._save_json(manager.mood_file, {'bench_user': history})
+        new_entry = {'date': generators.EPOCH, 'mood': "Calm", 'score': 6, 'notes': "", 'voice_analysis': ""}
+        size_repeats = repeats if size <= 10_000 else 1
+
+        yield (f"data_manager.save_mood_entry[{size}]", {'entries': size},
+               lambda manager=manager: manager.save_mood_entry('bench_user', dict(new_entry)), size_repeats)
+        yield (f"data_manager.load_mood_history[{size}]", {'entries': size},
+               lambda manager=manager: manager.load_mood_history('bench_user'), size_repeats)
+        yield (f"data_manager.export_user_data[{size}]", {'entries': size},
+               lambda manager=manager: manager.export_user_data('bench_user'), size_repeats)
+
+
+def bench_cohorts(repeats, user_counts, workdir):
+    """Cohort queries over DataManager's daily rollups, against a full-history scan"""
+    from utils.data_manager import DataManager
+    from utils.mood_rollups import MoodRollups
+    as_of = (generators.EPOCH + timedelta(days=COHORT_DAYS - 1)).date()
+    for users in user_counts:
+        manager = DataManager(os.path.join(workdir, f"cohort_{users}"))
+        manager._save_json(manager.mood_file, generators.cohort_history(users, COHORT_DAYS, seed=users))
+        manager.rebuild_mood_rollups()
+        params = {'users': users, 'days': COHORT_DAYS}
+
+        def full_history_daily_average(manager=manager):
+            # What a cohort view costs without rollups: read and aggregate every entry
+            return MoodRollups.from_history(manager._load_json(manager.mood_file)).daily_average()
+
+        def cold_load(manager=manager):
+            manager._rollups = None
+            return manager.load_mood_rollups()
+
+        new_entry = {'date': as_of.isoformat(), 'mood': "Calm", 'score': 6, 'notes': "", 'voice_analysis': ""}
+        yield (f"cohort.full_history_daily_average[{users}u]", params, full_history_daily_average, 1)
+        yield (f"cohort.rebuild_rollups[{users}u]", params, manager.rebuild_mood_rollups, 1)
+        yield (f"cohort.load_rollups_cold[{users}u]", params, cold_load, repeats)
+        yield (f"cohort.daily_average[{users}u]", params,
+               lambda manager=manager: manager.cohort_daily_average(), repeats)
+        yield (f"cohort.trending_down[{users}u]", params,
+               lambda manager=manager: manager.cohort_trending_down(as_of), repeats)
+        def rollup_update(manager=manager):
+            # The rollup share of save_mood_entry: one delta line plus its replay
+            with manager._rollup_lock:
+                manager._load_rollups()
+                manager._record_rollup_delta('user_000000', new_entry)
+
+        yield (f"cohort.rollup_update[{users}u]", params, rollup_update, repeats)
+        yield (f"cohort.save_mood_entry[{users}u]", params,
+               lambda manager=manager: manager.save_mood_entry('user_000000', dict(new_entry)), 1)
+
+
+def run_benchmarks(sizes, repeats, name_filter=None, user_counts=DEFAULT_USERS):
+    """Run every benchmark and return the result records"""
+    workdir = tempfile.mkdtemp(prefix="mindvoice_bench_")
+    groups = [
+        ('audio', lambda: bench_audio(repeats)),
+        ('text', lambda: bench_text(repeats)),
+        ('multimodal', lambda: bench_multimodal(repeats)),
+        ('insights', lambda: bench_insights(repeats, sizes)),
+        ('data_manager', lambda: bench_data_manager(repeats, sizes, workdir)),
+        ('cohort', lambda: bench_cohorts(repeats, user_counts, workdir)),
+    ]
+    results = []
+    try:
+        for group, make_cases in groups:
+            try:
+                cases = list(make_cases())
+            except ImportError as e:
+                print(f"Skipping {group} benchmarks: {e}", file=sys.stderr)
+                results.append({'name': f"{group}.*", 'skipped': str(e)})
+                continue
+            for name, params, fn, case_repeats in cases:
+                if name_filter and name_filter not in name:
+                    continue
+                stats = measure(fn, repeats=case_repeats)
+                print(f"{name:50s} {stats['median_ms']:10.2f} ms", file=sys.stderr)
+                results.append({'name': name, 'params': params, **stats})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(baseline, current, threshold):
+    """Return (name, old_ms, new_ms, change) for benchmarks slower than threshold"""
+    old = {r['name']: r for r in baseline['results'] if 'median_ms' in r}
+    regressions = []
+    for result in current['results']:
+        previous = old.get(result['name'])
+        if previous is None or 'median_ms' not in result or previous['median_ms'] <= 0:
+            continue
+        change = result['median_ms'] / previous['median_ms'] - 1
+        if change > threshold:
+            regressions.append((result['name'], previous['median_ms'], result['median_ms'], change))
+    return regressions
+
+
+def report_regressions(regressions, threshold):
+    """Print regressions and return the process exit code"""
+    if not regressions:
+        print(f"No regressions above {threshold:.0%}")
+        return 0
+    print(f"Regressions above {threshold:.0%}:")
+    for name, old_ms, new_ms, change in regressions:
+        print(f"  {name:50s} {old_ms:10.2f} -> {new_ms:10.2f} ms  (+{change:.0%})")
+    return 1
+
+
+def load_report(path):
+    """Read a JSON report written by this script"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated mood history sizes (up to 1000000)")
+    parser.add_argument("--users", default=",".join(str(u) for u in DEFAULT_USERS),
+                        help="comma-separated user counts for the cohort benchmarks")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--filter", dest="name_filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="report to compare this run against")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two existing reports without running")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative slowdown of the median that counts as a regression")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        baseline, current = (load_report(path) for path in args.compare)
+        return report_regressions(compare(baseline, current, args.threshold), args.threshold)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    user_counts = [int(users) for users in args.users.split(",") if users]
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': sizes,
+            'users': user_counts,
+            'repeats': args.repeats
+        },
+        'results': run_benchmarks(sizes, args.repeats, args.name_filter, user_counts)
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        return report_regressions(compare(load_report(args.baseline), report, args.threshold), args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Check batched audio features against single-clip extraction.
+
+Builds random batches of clips with different kinds, lengths and
+loudness and compares AudioMoodAnalyzer.extract_features_batch with
+extract_features on each clip alone. A clip's features must not depend
+on what it was batched with. Exits non-zero on mismatch.
+
+    python scripts/check_batch_features.py --trials 20
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import generators  # noqa: E402
+from utils.audio_processing import AudioMoodAnalyzer  # noqa: E402
+
+FEATURE_NAMES = [f"mfcc{i}" for i in range(13)] + ["pitch", "energy", "spectral_centroid", "tempo"]
+
+
+def random_batch(rng, max_clips, max_seconds):
+    """Clips of random kind, length and gain, from near-silent to full scale"""
+    kinds = list(generators.AUDIO_GENERATORS)
+    clips = []
+    for _ in range(int(rng.integers(2, max_clips + 1))):
+        generate = generators.AUDIO_GENERATORS[kinds[int(rng.integers(len(kinds)))]]
+        seconds = float(rng.uniform(0.5, max_seconds))
+        gain = 10 ** float(rng.uniform(-3, 0))
+        clips.append((generate(seconds, seed=int(rng.integers(1 << 30))) * gain).astype(np.float32))
+    return clips
+
+
+def check(analyzer, clips, rtol, atol):
+    """Return a list of mismatches between batched and single-clip features"""
+    batched = analyzer.extract_features_batch(clips, generators.SAMPLE_RATE)
+    errors = []
+    for index, clip in enumerate(clips):
+        single = analyzer.extract_features(clip, generators.SAMPLE_RATE)
+        mismatched = ~np.isclose(batched[index], single, rtol=rtol, atol=atol)
+        for feature in np.flatnonzero(mismatched):
+            errors.append(f"clip {index} {FEATURE_NAMES[feature]}: "
+                          f"{batched[index][feature]:.4f} != {single[feature]:.4f}")
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--max-clips", type=int, default=6)
+    parser.add_argument("--max-seconds", type=float, default=4.0)
+    parser.add_argument("--rtol", type=float, default=1e-4)
+    parser.add_argument("--atol", type=float, default=1e-3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    analyzer = AudioMoodAnalyzer()
+    failures = 0
+    for trial in range(args.trials):
+        clips = random_batch(rng, args.max_clips, args.max_seconds)
+        errors = check(analyzer, clips, args.rtol, args.atol)
+        if errors:
+            failures += 1
+            print(f"Trial {trial} ({len(clips)} clips): {'; '.join(errors[:5])}")
+
+    print(f"{args.trials - failures}/{args.trials} batches match single-clip extraction")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Check MoodAggregates against a full recomputation over the history.
+
+Generates random mood histories and compares the running aggregates with
+the stats the sidebar used to compute on every rerun (np.mean over all
+scores and a linear scan for today's entries). Exits non-zero on mismatch.
+
+    python scripts/check_mood_aggregates.py --trials 200
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.mood_stats import MoodAggregates  # noqa: E402
+
+
+def random_history(rng, size, now):
+    """Mood entries spread over the last 30 days, in random order"""
+    moods = ["Happy", "Sad", "Neutral", "Anxious", "Excited", "Calm"]
+    return [
+        {
+            'timestamp': now - timedelta(minutes=int(rng.integers(0, 30 * 24 * 60))),
+            'mood': str(rng.choice(moods)),
+            'score': int(rng.integers(1, 11)),
+            'notes': "",
+            'voice_analysis': ""
+        }
+        for _ in range(size)
+    ]
+
+
+def check(entries, now):
+    """Return a list of mismatches between running and full stats"""
+    aggregates = MoodAggregates()
+    for entry in entries:
+        aggregates.add(entry)
+
+    errors = []
+    expected_avg = np.mean([entry['score'] for entry in entries])
+    if not np.isclose(aggregates.average_score, expected_avg):
+        errors.append(f"average {aggregates.average_score} != {expected_avg}")
+
+    for day in {entry['timestamp'].date() for entry in entries} | {now.date()}:
+        expected = len([e for e in entries if e['timestamp'].date() == day])
+        if aggregates.entries_on(day) != expected:
+            errors.append(f"entries on {day}: {aggregates.entries_on(day)} != {expected}")
+
+    rebuilt = MoodAggregates.from_entries(entries)
+    if (rebuilt.count, rebuilt.score_sum, rebuilt.entries_per_day) != \
+            (aggregates.count, aggregates.score_sum, aggregates.entries_per_day):
+        errors.append("from_entries differs from incremental updates")
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=100)
+    parser.add_argument("--max-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    now = datetime.now()
+    failures = 0
+    for trial in range(args.trials):
+        entries = random_history(rng, int(rng.integers(1, args.max_size + 1)), now)
+        errors = check(entries, now)
+        if errors:
+            failures += 1
+            print(f"Trial {trial} ({len(entries)} entries): {'; '.join(errors)}")
+
+    print(f"{args.trials - failures}/{args.trials} histories match the full recomputation")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Import-time profile for the app's cold start.
+
+Runs each target in a fresh interpreter with ``python -X importtime`` and
+reports the slowest imports. Use ``--budget-ms`` to fail (exit code 1)
+when a target's total import time exceeds the budget, e.g. in CI:
+
+    python scripts/import_profile.py --budget-ms 1500
+    python scripts/import_profile.py --json import_profile.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules imported when the app starts; heavy libraries must not appear here
+DEFAULT_TARGETS = [
+    "utils.audio_processing",
+    "utils.mood_analysis",
+    "utils.data_manager",
+    "utils.job_queue",
+    "utils.resources",
+]
+
+
+def profile_target(target):
+    """Import target in a subprocess and return per-module timings.
+
+    Only the target's own import tree counts; interpreter startup (site,
+    encodings, ...) is reported by importtime too but is left out.
+    """
+    code = f"import {target}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr}")
+
+    modules = []
+    pending = []
+    for line in result.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, rest = line.split(":", 1)
+        self_us, cumulative_us, name = rest.split("|", 2)
+        pending.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip())) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000
+        })
+        # importtime lists children before their parent, so a top-level
+        # line closes the tree of everything listed since the previous one
+        if pending[-1]['depth'] == 0:
+            if pending[-1]['module'] == target:
+                modules = pending
+            pending = []
+
+    total_ms = modules[-1]['cumulative_ms'] if modules else 0.0
+    return {'target': target, 'total_ms': total_ms, 'modules': modules}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS,
+                        help="modules to profile (default: app startup modules)")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to show per target")
+    parser.add_argument("--budget-ms", type=float, help="fail if any target exceeds this total")
+    parser.add_argument("--json", dest="json_path", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    reports = [profile_target(target) for target in args.targets]
+    over_budget = []
+
+    for report in reports:
+        print(f"\n{report['target']}: {report['total_ms']:.1f} ms")
+        slowest = sorted(report['modules'], key=lambda m: m['cumulative_ms'], reverse=True)
+        for module in slowest[:args.top]:
+            print(f"  {module['cumulative_ms']:9.1f} ms  {module['module']}")
+        if args.budget_ms is not None and report['total_ms'] > args.budget_ms:
+            over_budget.append(report['target'])
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+    if over_budget:
+        print(f"\nOver the {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
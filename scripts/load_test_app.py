@@ -0,0 +1,269 @@
+"""Multi-session load test for the Streamlit app.
+
+Drives N simulated sessions through the real app.py with Streamlit's
+AppTest harness. As on a Streamlit server, the sessions run as threads
+of one process, so they share the cache_resource singletons, the session
+store, the job queue and the GIL. Each session repeats a weighted mix of
+quick mood logs, Mood Analyzer saves, journal writes, Tracker views and
+CSV exports against a temporary data directory. For each concurrency
+level the script reports requests/sec, latency percentiles, CPU use and
+the process's peak RSS.
+
+    python scripts/load_test_app.py --concurrency 1,2,4,8 --duration 20
+    python scripts/load_test_app.py --concurrency 4 --duration 60 --json capacity.json
+
+The Voice tab's recording flow is not included: its simulated recording
+sleeps for five seconds, which would only measure the sleep.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+sys.path.insert(0, REPO_ROOT)
+
+from utils.instrumentation import percentile  # noqa: E402
+
+# Relative frequency of each action in a session's workload
+ACTION_WEIGHTS = {
+    'quick_log': 4,
+    'analyzer_save': 2,
+    'journal_write': 2,
+    'tracker_view': 3,
+    'export': 1,
+}
+
+
+def find(elements, label_prefix):
+    """First element whose label starts with label_prefix"""
+    for element in elements:
+        if element.label.startswith(label_prefix):
+            return element
+    raise LookupError(f"No element labelled {label_prefix!r}")
+
+
+def action_quick_log(at, rng):
+    label = "😊 Good" if rng.random() < 0.6 else "😢 Down"
+    find(at.button, label).click().run()
+
+
+def action_analyzer_save(at, rng):
+    find(at.selectbox, "How are you feeling").select_index(rng.randrange(9))
+    find(at.slider, "Rate the intensity").set_value(rng.randint(1, 10))
+    find(at.text_area, "Additional thoughts").input(f"Load test note {rng.random():.6f}")
+    find(at.button, "📊 Analyze & Save Mood").click().run()
+
+
+def action_journal_write(at, rng):
+    find(at.text_input, "Entry Title").input(f"Load test {rng.randrange(10**6)}")
+    find(at.text_area, "How was your day").input(
+        "Felt calm after a long walk, then a stressful meeting at work. " * rng.randint(1, 5))
+    find(at.button, "💾 Save Journal Entry").click().run()
+
+
+def action_tracker_view(at, rng):
+    # Tabs render on every full run; a plain rerun is what viewing costs
+    at.run()
+
+
+def action_export(at, rng):
+    find(at.button, "📥 Export Mood Data").click().run()
+
+
+ACTIONS = {
+    'quick_log': action_quick_log,
+    'analyzer_save': action_analyzer_save,
+    'journal_write': action_journal_write,
+    'tracker_view': action_tracker_view,
+    'export': action_export,
+}
+
+
+def current_rss_bytes():
+    """Resident set size of this process"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # Fallback: peak RSS (KiB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def share_streamlit_runtime():
+    """Let AppTest sessions run concurrently in one process.
+
+    AppTest installs a mock Runtime singleton at the start of each run and
+    clears it at the end, so parallel sessions would clear it under each
+    other's feet. Runtime lookups fall back to the last runtime installed
+    instead, much like the single runtime of a real server.
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+
+    last_runtime = []
+
+    def instance(cls):
+        current = cls._instance
+        if current is not None:
+            last_runtime[:] = [current]
+            return current
+        if last_runtime:
+            return last_runtime[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last_runtime))
+    # AppTest patches this option per run and restores it afterwards
+    config.set_option("global.appTest", True)
+
+
+def run_session(session_index, duration, seed, start_barrier, results, errors):
+    """One simulated user: open the app, then perform weighted random actions.
+
+    Opening the app (imports, first render, sample data) happens before
+    start_barrier, so start-up is not counted against throughput.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 1000 + session_index)
+    names = list(ACTION_WEIGHTS)
+    weights = [ACTION_WEIGHTS[name] for name in names]
+
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=120)
+        start = time.perf_counter()
+        at.run()
+        # Give every session some history so Tracker and export have work to do
+        find(at.button, "📊 Load Sample Data").click().run()
+        results.append(('open', (time.perf_counter() - start) * 1000))
+    except Exception as e:
+        errors.append(('open', f"{type(e).__name__}: {e}"))
+        start_barrier.abort()
+        return
+
+    start_barrier.wait()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            ACTIONS[name](at, rng)
+            if at.exception:
+                raise RuntimeError(at.exception[0].message)
+        except Exception as e:
+            errors.append((name, f"{type(e).__name__}: {e}"))
+            # A failed action can leave widgets stale; start from a fresh render
+            at.run()
+            continue
+        results.append((name, (time.perf_counter() - start) * 1000))
+
+
+def summarize(latencies):
+    """Latency percentiles in ms"""
+    ordered = sorted(latencies)
+    return {
+        'count': len(ordered),
+        'p50_ms': percentile(ordered, 0.50),
+        'p95_ms': percentile(ordered, 0.95),
+        'p99_ms': percentile(ordered, 0.99),
+        'max_ms': ordered[-1] if ordered else 0.0
+    }
+
+
+def run_level(concurrency, duration, seed):
+    """Run concurrency sessions for duration seconds and return the measurements"""
+    results, errors = [], []
+    start_barrier = threading.Barrier(concurrency + 1)
+    threads = [
+        threading.Thread(target=run_session, daemon=True,
+                         args=(i, duration, seed, start_barrier, results, errors))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        start_barrier.wait()
+    except threading.BrokenBarrierError:
+        for thread in threads:
+            thread.join()
+        raise RuntimeError(f"A session failed to open the app: {errors[0][1] if errors else 'unknown'}")
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    peak_rss = current_rss_bytes()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(0.25)
+        peak_rss = max(peak_rss, current_rss_bytes())
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    requests = [ms for name, ms in results if name != 'open']
+    by_action = {}
+    for name, ms in results:
+        by_action.setdefault(name, []).append(ms)
+
+    return {
+        'concurrency': concurrency,
+        'duration_s': wall,
+        'requests': len(requests),
+        'errors': len(errors),
+        'error_samples': sorted({message for _, message in errors})[:5],
+        'requests_per_s': len(requests) / wall if wall else 0.0,
+        'cpu_cores_used': cpu / wall if wall else 0.0,
+        'cpu_ms_per_request': cpu * 1000 / len(requests) if requests else 0.0,
+        'peak_rss_mb': peak_rss / 2**20,
+        'latency': summarize(requests),
+        'by_action': {name: summarize(values) for name, values in sorted(by_action.items())}
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,2,4,8", help="comma-separated session counts")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per concurrency level")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    parser.add_argument("--keep-data", action="store_true", help="keep the temporary data directory")
+    args = parser.parse_args(argv)
+
+    data_dir = tempfile.mkdtemp(prefix="mindvoice_load_")
+    os.environ["MINDVOICE_DATA_DIR"] = data_dir
+    share_streamlit_runtime()
+
+    levels = []
+    try:
+        print(f"{'sessions':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'errors':>6} {'cores':>6} {'RSS MB':>8}")
+        for concurrency in [int(value) for value in args.concurrency.split(",")]:
+            level = run_level(concurrency, args.duration, args.seed)
+            levels.append(level)
+            latency = level['latency']
+            print(f"{concurrency:>8} {level['requests_per_s']:>8.1f} {latency['p50_ms']:>8.1f} "
+                  f"{latency['p95_ms']:>8.1f} {latency['p99_ms']:>8.1f} {level['errors']:>6} "
+                  f"{level['cpu_cores_used']:>6.2f} {level['peak_rss_mb']:>8.1f}")
+            for message in level['error_samples']:
+                print(f"         error: {message}")
+    finally:
+        if not args.keep_data:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'action_weights': ACTION_WEIGHTS, 'levels': levels}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Load test for the inference service across micro-batching settings.
+
+For every (max batch size, max wait) pair, starts the service with uvicorn
+on a local port, fires requests from concurrent clients and reports
+throughput and tail latency.
+
+    python scripts/load_test_inference.py --endpoint audio --batch-sizes 1,4,8 --wait-ms 0,10
+    python scripts/load_test_inference.py --endpoint text --requests 2000 --concurrency 64 --json out.json
+"""
+import argparse
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from utils.inference_client import InferenceClient  # noqa: E402
+from utils.instrumentation import percentile  # noqa: E402
+
+
+def free_port():
+    """An unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_service(port, max_batch_size, max_wait_ms):
+    """Launch the service in a subprocess and wait until it is healthy"""
+    env = dict(os.environ,
+               MINDVOICE_MAX_BATCH_SIZE=str(max_batch_size),
+               MINDVOICE_MAX_WAIT_MS=str(max_wait_ms))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "utils.inference_service:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env
+    )
+    client = InferenceClient(f"http://127.0.0.1:{port}")
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if client.healthy():
+            client.close()
+            return process
+        if process.poll() is not None:
+            raise RuntimeError("Inference service exited during startup")
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Inference service did not become healthy")
+
+
+def make_payloads(endpoint, count):
+    """Deterministic request payloads"""
+    from benchmarks import generators
+    if endpoint == 'text':
+        return [generators.journal_text(60, seed=i) for i in range(count)]
+
+    import soundfile as sf
+    payloads = []
+    for i in range(count):
+        buffer = io.BytesIO()
+        sf.write(buffer, generators.speech_like(3, seed=i), generators.SAMPLE_RATE, format="WAV")
+        payloads.append(buffer.getvalue())
+    return payloads
+
+
+def run_load(base_url, endpoint, payloads, total_requests, concurrency):
+    """Send total_requests from concurrency threads; return latencies and wall time"""
+    client = InferenceClient(base_url, pool_size=concurrency)
+    call = client.analyze_text if endpoint == 'text' else client.analyze_audio
+
+    # Warm up analyzers so the first batch doesn't include model loading
+    call(payloads[0])
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            call(payloads[i % len(payloads)])
+            ok = True
+        except Exception:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(one, range(total_requests)))
+    wall = time.perf_counter() - start
+    client.close()
+    return outcomes, wall
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint", choices=["audio", "text"], default="text")
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    parser.add_argument("--wait-ms", default="0,5,20")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    payloads = make_payloads(args.endpoint, 16)
+    rows = []
+    print(f"{'batch':>5} {'wait':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6} {'mean batch':>10}")
+    for max_batch_size in [int(v) for v in args.batch_sizes.split(",")]:
+        for max_wait_ms in [float(v) for v in args.wait_ms.split(",")]:
+            port = free_port()
+            process = start_service(port, max_batch_size, max_wait_ms)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                outcomes, wall = run_load(base_url, args.endpoint, payloads, args.requests, args.concurrency)
+                stats = InferenceClient(base_url).session.get(f"{base_url}/stats").json()[args.endpoint]
+            finally:
+                process.terminate()
+                process.wait()
+
+            latencies = sorted(ms for ms, _ in outcomes)
+            row = {
+                'max_batch_size': max_batch_size,
+                'max_wait_ms': max_wait_ms,
+                'requests': args.requests,
+                'concurrency': args.concurrency,
+                'throughput_rps': len(outcomes) / wall,
+                'p50_ms': percentile(latencies, 0.50),
+                'p95_ms': percentile(latencies, 0.95),
+                'p99_ms': percentile(latencies, 0.99),
+                'errors': sum(1 for _, ok in outcomes if not ok),
+                'mean_batch_size': stats['mean_batch_size']
+            }
+            rows.append(row)
+            print(f"{max_batch_size:>5} {max_wait_ms:>6.0f} {row['throughput_rps']:>8.1f} {row['p50_ms']:>8.1f} "
+                  f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['errors']:>6} {row['mean_batch_size']:>10.2f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'endpoint': args.endpoint, 'results': rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
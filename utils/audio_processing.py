@@ -1,8 +1,9 @@
-import librosa
+import io
 import numpy as np
-from textblob import TextBlob
-import pickle
-import os
+from utils.instrumentation import span, timed
+
+# librosa takes seconds to import, so it is loaded on first use inside the
+# methods that need it rather than at module import time.
 
 class AudioMoodAnalyzer:
     def __init__(self):
@@ -11,85 +12,179 @@ class AudioMoodAnalyzer:
     def extract_features(self, audio_data, sample_rate):
         """Extract audio features for mood analysis"""
         try:
-            # Extract MFCC features
+            return self.compute_features(audio_data, sample_rate)
+        except Exception as e:
+            print(f"Error extracting features: {e}")
+            return np.zeros(17)  # Return zero array if extraction fails
+    
+    @timed("audio.extract_features")
+    def compute_features(self, audio_data, sample_rate):
+        """Extract audio features, raising instead of returning zeros on failure.
+        
+        The zero vector from extract_features classifies as a confident
+        'Sad', so callers that can report a failure use this instead.
+        """
+        self.check_signal(audio_data)
+        import librosa
+        
+        # Extract MFCC features
+        with span("audio.mfcc"):
             mfccs = librosa.feature.mfcc(y=audio_data, sr=sample_rate, n_mfcc=13)
             mfccs_mean = np.mean(mfccs, axis=1)
-            
-            # Extract pitch/fundamental frequency
+        
+        # Extract pitch/fundamental frequency
+        with span("audio.piptrack"):
             pitches, magnitudes = librosa.piptrack(y=audio_data, sr=sample_rate)
             pitch_mean = np.mean(pitches[pitches > 0]) if len(pitches[pitches > 0]) > 0 else 0
-            
-            # Extract energy/RMS
+        
+        # Extract energy/RMS
+        with span("audio.rms"):
             rms = librosa.feature.rms(y=audio_data)[0]
             energy_mean = np.mean(rms)
-            
-            # Extract spectral centroid (brightness)
+        
+        # Extract spectral centroid (brightness)
+        with span("audio.spectral_centroid"):
             spectral_centroids = librosa.feature.spectral_centroid(y=audio_data, sr=sample_rate)[0]
             spectral_centroid_mean = np.mean(spectral_centroids)
-            
-            # Extract tempo
+        
+        # Extract tempo
+        with span("audio.beat_track"):
             tempo, _ = librosa.beat.beat_track(y=audio_data, sr=sample_rate)
-            
-            features = np.concatenate([
-                mfccs_mean,
-                [pitch_mean, energy_mean, spectral_centroid_mean, tempo]
-            ])
-            
-            return features
-            
-        except Exception as e:
-            print(f"Error extracting features: {e}")
-            return np.zeros(17)  # Return zero array if extraction fails
+        tempo = float(np.atleast_1d(tempo)[0])  # newer librosa returns an array
+        
+        features = np.concatenate([
+            mfccs_mean,
+            [pitch_mean, energy_mean, spectral_centroid_mean, tempo]
+        ])
+        
+        return features
     
+    @timed("audio.predict_mood")
     def predict_mood(self, audio_bytes):
         """Predict mood from audio data"""
         try:
-            # Convert bytes to audio array
-            audio_data, sample_rate = librosa.load(io.BytesIO(audio_bytes))
+            import librosa
             
-            # Extract features
-            features = self.extract_features(audio_data, sample_rate)
+            # Convert bytes to audio array
+            with span("audio.decode"):
+                audio_data, sample_rate = librosa.load(io.BytesIO(audio_bytes))
             
-            # Simple rule-based classification (replace with ML model in production)
-            return self._rule_based_classification(features)
+            return self.predict_mood_from_signal(audio_data, sample_rate)
             
         except Exception as e:
             print(f"Error in mood prediction: {e}")
             return self._get_random_mood()
     
-    def _rule_based_classification(self, features):
-        """Simple rule-based mood classification"""
-        pitch = features[13]
-        energy = features[14]
-        spectral_centroid = features[15]
-        tempo = features[16]
+    def predict_mood_from_signal(self, audio_data, sample_rate):
+        """Predict mood from an already decoded audio signal.
+        
+        Raises if the features cannot be extracted, e.g. for an empty or
+        non-finite signal.
+        """
+        # Extract features
+        features = self.compute_features(audio_data, sample_rate)
+        
+        # Simple rule-based classification (replace with ML model in production)
+        return self._rule_based_classification(features)
+    
+    @timed("audio.extract_features_batch")
+    def extract_features_batch(self, signals, sample_rate):
+        """Extract features for several clips in one vectorized pass.
+        
+        The mel spectrogram, RMS and spectral centroid run once over a
+        zero-padded (clips, samples) array and are averaged over each clip's
+        own frames; only the dB scaling for the MFCCs is done per clip.
+        Pitch and tempo are still computed per clip.
+        """
+        if not signals:
+            return np.zeros((0, 17))
+        try:
+            import librosa
+            
+            hop_length = 512
+            lengths = np.array([len(signal) for signal in signals])
+            batch = np.zeros((len(signals), lengths.max()), dtype=np.float32)
+            for i, signal in enumerate(signals):
+                batch[i, :len(signal)] = signal
+            
+            with span("audio.mfcc"):
+                mel = librosa.feature.melspectrogram(y=batch, sr=sample_rate, hop_length=hop_length)
+                # power_to_db floors at 80 dB below the loudest value, so it runs
+                # per clip; otherwise a quiet clip's MFCCs would depend on the
+                # loudest clip it was batched with
+                log_mel = np.stack([librosa.power_to_db(clip_mel) for clip_mel in mel])
+                mfccs = librosa.feature.mfcc(S=log_mel, n_mfcc=13)
+            with span("audio.rms"):
+                rms = librosa.feature.rms(y=batch, hop_length=hop_length)[:, 0, :]
+            with span("audio.spectral_centroid"):
+                spectral_centroids = librosa.feature.spectral_centroid(y=batch, sr=sample_rate, hop_length=hop_length)[:, 0, :]
+            
+            # Average only over frames that belong to each clip, not its padding
+            frame_mask = np.arange(mfccs.shape[-1])[None, :] < (1 + lengths // hop_length)[:, None]
+            frame_counts = frame_mask.sum(axis=1)
+            mfccs_mean = (mfccs * frame_mask[:, None, :]).sum(axis=2) / frame_counts[:, None]
+            energy_mean = (rms * frame_mask).sum(axis=1) / frame_counts
+            spectral_centroid_mean = (spectral_centroids * frame_mask).sum(axis=1) / frame_counts
+            
+            pitch_mean = np.zeros(len(signals))
+            tempo = np.zeros(len(signals))
+            for i, signal in enumerate(signals):
+                with span("audio.piptrack"):
+                    pitches, magnitudes = librosa.piptrack(y=signal, sr=sample_rate)
+                    voiced = pitches[pitches > 0]
+                    pitch_mean[i] = np.mean(voiced) if len(voiced) > 0 else 0
+                with span("audio.beat_track"):
+                    clip_tempo, _ = librosa.beat.beat_track(y=signal, sr=sample_rate)
+                tempo[i] = float(np.atleast_1d(clip_tempo)[0])
+            
+            return np.column_stack([mfccs_mean, pitch_mean, energy_mean, spectral_centroid_mean, tempo])
+            
+        except Exception as e:
+            print(f"Error extracting batch features, falling back to per-clip extraction: {e}")
+            return np.array([self.extract_features(signal, sample_rate) for signal in signals])
+    
+    @staticmethod
+    def check_signal(audio_data):
+        """Raise ValueError for a signal that cannot be analyzed"""
+        if len(audio_data) == 0:
+            raise ValueError("Audio signal is empty")
+        if not np.all(np.isfinite(audio_data)):
+            raise ValueError("Audio signal contains NaN or infinite samples")
+    
+    def predict_moods_from_signals(self, signals, sample_rate):
+        """Predict moods for several decoded clips sharing a sample rate"""
+        return self.classify_features_batch(self.extract_features_batch(signals, sample_rate))
+    
+    def classify_features_batch(self, features):
+        """Rule-based classification of a (clips, 17) feature matrix"""
+        features = np.atleast_2d(features)
+        pitch = features[:, 13]
+        energy = features[:, 14]
+        spectral_centroid = features[:, 15]
+        tempo = features[:, 16]
         
         # Normalize values (simplified)
-        pitch_norm = min(pitch / 200, 1.0) if pitch > 0 else 0
-        energy_norm = min(energy * 100, 1.0)
-        tempo_norm = min(tempo / 180, 1.0) if tempo > 0 else 0
+        pitch_norm = np.where(pitch > 0, np.minimum(pitch / 200, 1.0), 0)
+        energy_norm = np.minimum(energy * 100, 1.0)
+        tempo_norm = np.where(tempo > 0, np.minimum(tempo / 180, 1.0), 0)
         
-        # Rule-based classification
-        if energy_norm > 0.7 and tempo_norm > 0.6:
-            mood = "Energetic"
-            confidence = 0.8
-        elif pitch_norm < 0.3 and energy_norm < 0.4:
-            mood = "Sad"
-            confidence = 0.7
-        elif energy_norm > 0.6 and pitch_norm > 0.5:
-            mood = "Happy"
-            confidence = 0.75
-        elif energy_norm < 0.3:
-            mood = "Tired"
-            confidence = 0.6
-        elif spectral_centroid > 2000:
-            mood = "Anxious"
-            confidence = 0.65
-        else:
-            mood = "Calm"
-            confidence = 0.6
+        # Rules are checked in order; the first match wins
+        rules = [
+            (energy_norm > 0.7) & (tempo_norm > 0.6),
+            (pitch_norm < 0.3) & (energy_norm < 0.4),
+            (energy_norm > 0.6) & (pitch_norm > 0.5),
+            energy_norm < 0.3,
+            spectral_centroid > 2000
+        ]
+        moods = np.select(rules, ["Energetic", "Sad", "Happy", "Tired", "Anxious"], default="Calm")
+        confidences = np.select(rules, [0.8, 0.7, 0.75, 0.6, 0.65], default=0.6)
         
-        return mood, confidence, self._generate_mood_scores(mood)
+        return [(str(mood), float(confidence), self._generate_mood_scores(str(mood)))
+                for mood, confidence in zip(moods, confidences)]
+    
+    def _rule_based_classification(self, features):
+        """Simple rule-based mood classification"""
+        return self.classify_features_batch(features)[0]
     
     def _generate_mood_scores(self, predicted_mood):
         """Generate scores for all moods"""
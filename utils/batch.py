@@ -0,0 +1,189 @@
+"""Headless batch mood analysis.
+
+Runs AudioMoodAnalyzer over a directory of audio files and/or
+TextMoodAnalyzer over a JSONL file of journal texts, spread across a
+process pool. Results are appended to a JSONL file as each item finishes,
+so an interrupted run picks up where it stopped when started again with
+the same output file.
+
+    python -m utils.batch --audio-dir recordings/ --output scores.jsonl
+    python -m utils.batch --journal journal.jsonl --output scores.jsonl --parquet scores.parquet
+
+Journal lines are JSON objects with a "text" field (or "title"/"content"
+as saved by the app) and an optional "id".
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from utils.serialization import to_builtin
+
+AUDIO_EXTENSIONS = {'.wav', '.mp3', '.flac', '.ogg', '.m4a', '.aac', '.webm'}
+
+
+def iter_audio_jobs(audio_dir):
+    """(key, job) pairs for every audio file under audio_dir, in a stable order"""
+    for root, dirs, files in os.walk(audio_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS:
+                path = os.path.join(root, name)
+                rel_path = os.path.relpath(path, audio_dir)
+                yield f"audio:{rel_path}", {'kind': 'audio', 'source': rel_path, 'path': path}
+
+
+def iter_journal_jobs(journal_path):
+    """(key, job) pairs for every entry of a journal JSONL file"""
+    with open(journal_path, 'r') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = record.get('text')
+            if text is None:
+                text = " ".join(part for part in (record.get('title'), record.get('content')) if part)
+            entry_id = record.get('id', line_number)
+            yield f"text:{entry_id}", {'kind': 'text', 'source': str(entry_id), 'text': text}
+
+
+def load_completed_keys(output_path):
+    """Keys already in the output file; drops a partially written last line"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    good_size = 0
+    with open(output_path, 'rb') as f:
+        for raw_line in f:
+            try:
+                completed.add(json.loads(raw_line)['key'])
+            except (ValueError, KeyError):
+                break
+            good_size += len(raw_line)
+
+    if good_size < os.path.getsize(output_path):
+        with open(output_path, 'rb+') as f:
+            f.truncate(good_size)
+    return completed
+
+
+def analyze_job(job):
+    """Worker: analyze one audio file or text and return a result record"""
+    from utils.resources import get_audio_analyzer, get_text_analyzer
+
+    start = time.perf_counter()
+    result = {'kind': job['kind'], 'source': job['source']}
+    try:
+        if job['kind'] == 'audio':
+            import librosa
+            audio_data, sample_rate = librosa.load(job['path'])
+            mood, confidence, scores = get_audio_analyzer().predict_mood_from_signal(audio_data, sample_rate)
+            result.update({
+                'mood': mood,
+                'confidence': confidence,
+                'scores': scores,
+                'duration_s': len(audio_data) / sample_rate
+            })
+        else:
+            result.update(get_text_analyzer().analyze_text_mood(job['text']))
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+    return to_builtin(result)
+
+
+def run_batch(jobs, output_path, workers=None, max_in_flight=None, progress_every=5.0):
+    """Analyze (key, job) pairs not yet in output_path and append their results.
+
+    Returns a summary dict with counts and throughput.
+    """
+    completed = load_completed_keys(output_path)
+    pending = ((key, job) for key, job in jobs if key not in completed)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+
+    summary = {'skipped': len(completed), 'done': 0, 'failed': 0, 'by_kind': {}}
+    start = last_report = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, open(output_path, 'a') as out:
+        in_flight = {}
+        exhausted = False
+        while in_flight or not exhausted:
+            # Keep a bounded number of jobs queued so huge inputs stream through
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    key, job = next(pending)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[executor.submit(analyze_job, job)] = key
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = in_flight.pop(future)
+                record = {'key': key, **future.result()}
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+
+                summary['done'] += 1
+                summary['failed'] += int('error' in record)
+                summary['by_kind'][record['kind']] = summary['by_kind'].get(record['kind'], 0) + 1
+
+            now = time.perf_counter()
+            if now - last_report >= progress_every:
+                rate = summary['done'] / (now - start)
+                print(f"{summary['done']} done, {summary['failed']} failed, {rate:.1f} items/s",
+                      file=sys.stderr)
+                last_report = now
+
+    elapsed = time.perf_counter() - start
+    summary['elapsed_s'] = elapsed
+    summary['items_per_s'] = summary['done'] / elapsed if elapsed > 0 else 0.0
+    return summary
+
+
+def write_parquet(output_path, parquet_path):
+    """Materialize the JSONL results as a Parquet file (needs pyarrow)"""
+    import pandas as pd
+    df = pd.read_json(output_path, lines=True)
+    df.to_parquet(parquet_path, index=False)
+    return len(df)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch mood analysis of audio files and journal texts")
+    parser.add_argument("--audio-dir", help="directory of audio files (searched recursively)")
+    parser.add_argument("--journal", help="JSONL file of journal texts")
+    parser.add_argument("--output", required=True, help="JSONL results file, appended to and used for resuming")
+    parser.add_argument("--parquet", help="also write all results to this Parquet file when done")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    if not args.audio_dir and not args.journal:
+        parser.error("give --audio-dir and/or --journal")
+
+    def jobs():
+        if args.audio_dir:
+            yield from iter_audio_jobs(args.audio_dir)
+        if args.journal:
+            yield from iter_journal_jobs(args.journal)
+
+    summary = run_batch(jobs(), args.output, workers=args.workers)
+    kinds = ", ".join(f"{count} {kind}" for kind, count in sorted(summary['by_kind'].items())) or "nothing new"
+    print(f"Processed {kinds} in {summary['elapsed_s']:.1f}s "
+          f"({summary['items_per_s']:.1f} items/s); {summary['failed']} failed, "
+          f"{summary['skipped']} already done")
+
+    if args.parquet:
+        rows = write_parquet(args.output, args.parquet)
+        print(f"Wrote {rows} rows to {args.parquet}")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
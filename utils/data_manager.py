@@ -1,30 +1,59 @@
+import bisect
 import json
 import os
+import threading
+import uuid
 from datetime import datetime
-import pandas as pd
+from urllib.parse import quote
+from utils.instrumentation import span, timed
+from utils.journal_index import JournalIndex
+from utils.mood_rollups import MoodRollups
 
 class DataManager:
+    # The rollup snapshot is rewritten once its delta log grows past this
+    ROLLUP_LOG_MAX_BYTES = 4 * 2**20
+    # A user's journal index is rewritten once its log grows past this
+    JOURNAL_INDEX_LOG_MAX_BYTES = 2**20
+    # User IDs of anonymous, session-keyed journals; see session_user_id
+    SESSION_USER_PREFIX = "session:"
+    
     def __init__(self, data_dir="data"):
         self.data_dir = data_dir
         self.mood_file = os.path.join(data_dir, "mood_data.json")
         self.profile_file = os.path.join(data_dir, "user_profiles.json")
         self.journal_file = os.path.join(data_dir, "journal_entries.json")
+        self.journal_dir = os.path.join(data_dir, "journal")
+        self.session_journal_dir = os.path.join(self.journal_dir, "sessions")
+        self.session_dir = os.path.join(data_dir, "sessions")
+        self.rollup_file = os.path.join(data_dir, "mood_rollups.json")
+        
+        # Rollups stay loaded between queries. New saves are appended to a
+        # delta log and replayed from the last position read; the snapshot
+        # is reloaded only when its file changes.
+        self._rollups = None
+        self._rollups_stamp = None
+        self._rollup_generation = None
+        self._rollup_log_position = 0
+        self._rollup_lock = threading.Lock()
+        # Serializes journal writes with the matching search index updates
+        self._journal_lock = threading.RLock()
         
-        # Create data directory if it doesn't exist
-        os.makedirs(data_dir, exist_ok=True)
+        # Create data directories if they don't exist
+        os.makedirs(self.session_journal_dir, exist_ok=True)
+        os.makedirs(self.session_dir, exist_ok=True)
     
     def save_mood_entry(self, user_id, mood_entry):
-        """Save a mood entry to file"""
-        data = self._load_json(self.mood_file)
-        
-        if user_id not in data:
-            data[user_id] = []
-        
+        """Save a mood entry to file and fold it into the daily rollups"""
         # Convert datetime to string for JSON serialization
         mood_entry['date'] = mood_entry['date'].isoformat() if isinstance(mood_entry['date'], datetime) else mood_entry['date']
         
-        data[user_id].append(mood_entry)
-        self._save_json(self.mood_file, data)
+        with self._rollup_lock:
+            data = self._load_json(self.mood_file)
+            # Loaded before the append so a first-time build does not count the entry twice
+            self._load_rollups(data)
+            data.setdefault(user_id, []).append(mood_entry)
+            self._save_json(self.mood_file, data)
+            self._record_rollup_delta(user_id, mood_entry)
     
     def load_mood_history(self, user_id):
         """Load mood history for a user"""
@@ -38,30 +67,207 @@ class DataManager:
         
         return user_data
     
+    def load_mood_rollups(self):
+        """Load the per-user daily mood rollups, building them if missing"""
+        with self._rollup_lock:
+            return self._load_rollups()
+    
+    def rebuild_mood_rollups(self):
+        """Recompute the rollups from the full mood history"""
+        with self._rollup_lock, span("data.rollup_rebuild"):
+            rollups = MoodRollups.from_history(self._load_json(self.mood_file))
+            self._save_rollups(rollups)
+            return rollups
+    
+    @timed("data.cohort_daily_average")
+    def cohort_daily_average(self, start=None, end=None):
+        """Average mood score per day across all users; see MoodRollups.daily_average"""
+        with self._rollup_lock:
+            return self._load_rollups().daily_average(start, end)
+    
+    @timed("data.cohort_trending_down")
+    def cohort_trending_down(self, as_of=None, window_days=7, min_drop=0.5):
+        """Share of users whose mood is trending down; see MoodRollups.trending_down"""
+        with self._rollup_lock:
+            return self._load_rollups().trending_down(as_of, window_days, min_drop)
+    
     def save_journal_entry(self, user_id, journal_entry):
-        """Save a journal entry to file"""
-        data = self._load_json(self.journal_file)
+        """Save a journal entry, keeping the user's journal in date order.
         
-        if user_id not in data:
-            data[user_id] = []
+        The entry is also appended to the user's search index log. Returns
+        its byte offset in the journal, or None for a back-dated entry: that
+        one is inserted in place, which moves later entries, so the stored
+        index is dropped and rebuilt on its next load.
+        """
+        path = self._journal_path(user_id)
+        self._migrate_legacy_journal(user_id, path)
         
         # Convert datetime to string for JSON serialization
-        journal_entry['date'] = journal_entry['date'].isoformat() if isinstance(journal_entry['date'], datetime) else journal_entry['date']
+        entry = dict(journal_entry)
+        entry['date'] = entry['date'].isoformat() if isinstance(entry['date'], datetime) else entry['date']
+        line = json.dumps(entry, default=str) + "\n"
         
-        data[user_id].append(journal_entry)
-        self._save_json(self.journal_file, data)
+        with self._journal_lock:
+            newest, _ = self._read_journal_lines_backwards(path, None, 1)
+            if not newest or self._entry_date(json.loads(newest[0])) <= self._entry_date(entry):
+                # Common case: newest entry so far, append in place
+                with span("data.journal_append"), open(path, 'ab') as f:
+                    offset = f.tell()
+                    f.write(line.encode())
+                self._log_journal_index_entry(user_id, entry, offset)
+                return offset
+            
+            # Back-dated entry: insert at its position and rewrite the file
+            with span("data.journal_insert"):
+                lines = self._read_journal_lines(path)
+                dates = [self._entry_date(json.loads(existing)) for existing in lines]
+                lines.insert(bisect.bisect_right(dates, self._entry_date(entry)), line)
+                tmp_path = path + ".tmp"
+                with open(tmp_path, 'w') as f:
+                    f.writelines(lines)
+                os.replace(tmp_path, path)
+            self._delete_files(self._journal_index_path(user_id), self._journal_index_log_path(user_id))
+            return None
     
-    def load_journal_entries(self, user_id):
-        """Load journal entries for a user"""
-        data = self._load_json(self.journal_file)
-        user_data = data.get(user_id, [])
+    def load_journal_entries(self, user_id, cursor=None, limit=None):
+        """Load journal entries for a user.
         
-        # Convert date strings back to datetime objects
-        for entry in user_data:
-            if isinstance(entry['date'], str):
-                entry['date'] = datetime.fromisoformat(entry['date'])
+        Without a limit, returns every entry oldest first. With a limit,
+        returns one page newest first; see load_journal_page.
+        """
+        if limit is not None:
+            return self.load_journal_page(user_id, cursor, limit)[0]
         
-        return user_data
+        path = self._journal_path(user_id)
+        self._migrate_legacy_journal(user_id, path)
+        return [self._decode_journal_line(line) for line in self._read_journal_lines(path)]
+    
+    def load_journal_page(self, user_id, cursor=None, limit=5):
+        """Load one page of journal entries, newest first.
+        
+        Only the requested entries are read from disk. Returns
+        (entries, next_cursor); pass next_cursor back to get the following
+        (older) page. next_cursor is None once the oldest entry was returned.
+        A cursor stays valid while entries are appended, but not after a
+        back-dated entry is inserted.
+        """
+        path = self._journal_path(user_id)
+        self._migrate_legacy_journal(user_id, path)
+        with span("data.journal_page"):
+            lines, next_cursor = self._read_journal_lines_backwards(path, cursor, limit)
+        return [self._decode_journal_line(line) for line in lines], next_cursor
+    
+    def load_journal_entries_by_ids(self, user_id, entry_ids, offsets=None):
+        """Load the journal entries with the given IDs, in the order requested.
+        
+        offsets maps entry IDs to byte offsets in the journal (see
+        JournalIndex.offsets); those entries are read with one seek each.
+        Entries without an offset, or whose offset is out of date, are found
+        by scanning the journal.
+        """
+        path = self._journal_path(user_id)
+        offsets = offsets or {}
+        found = {}
+        with span("data.journal_by_ids"):
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                return []
+            with f:
+                for entry_id in entry_ids:
+                    if entry_id not in offsets:
+                        continue
+                    f.seek(offsets[entry_id])
+                    try:
+                        entry = self._decode_journal_line(f.readline())
+                    except (ValueError, KeyError):
+                        continue
+                    if entry.get('id') == entry_id:
+                        found[entry_id] = entry
+            
+            missing = set(entry_ids) - set(found)
+            if missing:
+                for _, line in self._iter_journal_lines(path):
+                    entry = json.loads(line)
+                    if entry.get('id') in missing:
+                        found[entry['id']] = self._decode_journal_line(line)
+                        missing.discard(entry['id'])
+                        if not missing:
+                            break
+        return [found[entry_id] for entry_id in entry_ids if entry_id in found]
+    
+    def save_journal_index(self, user_id, journal_index):
+        """Save a user's journal search index next to their journal, replacing its log"""
+        path = self._journal_index_path(user_id)
+        with self._journal_lock:
+            with span("data.journal_index_save"), open(path + ".tmp", 'w') as f:
+                json.dump(journal_index.to_dict(), f)
+            os.replace(path + ".tmp", path)
+            self._delete_files(self._journal_index_log_path(user_id))
+    
+    def load_journal_index(self, user_id):
+        """Load a user's journal search index: the snapshot plus the entries logged since.
+        
+        An index with fewer entries than the journal (none stored yet, or
+        dropped after a back-dated insert) is rebuilt from the journal and
+        saved.
+        """
+        path = self._journal_path(user_id)
+        with self._journal_lock:
+            stored = self._load_json(self._journal_index_path(user_id))
+            journal_index = JournalIndex.from_dict(stored) if stored else JournalIndex()
+            with span("data.journal_index_replay"):
+                for entry_id, offset, title, content, tags in self._read_journal_index_log(user_id):
+                    journal_index.add_entry(entry_id, {'title': title, 'content': content, 'tags': tags}, offset)
+            if len(journal_index) >= self._count_journal_lines(path):
+                return journal_index
+            
+            with span("data.journal_index_rebuild"):
+                journal_index = JournalIndex()
+                for position, (offset, line) in enumerate(self._iter_journal_lines(path)):
+                    entry = json.loads(line)
+                    journal_index.add_entry(entry.get('id', position), entry, offset)
+            self.save_journal_index(user_id, journal_index)
+        return journal_index
+    
+    def delete_journal(self, user_id):
+        """Remove a user's journal and its search index"""
+        self._delete_files(self._journal_path(user_id), self._journal_index_path(user_id),
+                           self._journal_index_log_path(user_id))
+    
+    @classmethod
+    def session_user_id(cls, session_id):
+        """User ID for a journal that belongs to a session rather than a known user.
+        
+        These journals are kept apart from the general journal store, and
+        only they are removed by delete_session_journal and
+        purge_stale_files.
+        """
+        return f"{cls.SESSION_USER_PREFIX}{session_id}"
+    
+    def delete_session_journal(self, session_id):
+        """Remove the journal of an expired session"""
+        self.delete_journal(self.session_user_id(session_id))
+    
+    def purge_stale_files(self, max_age_seconds):
+        """Delete session journals and snapshots untouched for max_age_seconds.
+        
+        Catches data of sessions that ended while the server was down, which
+        the session store never gets to expire. Journals of known users are
+        never touched. Returns the number of files removed.
+        """
+        cutoff = datetime.now().timestamp() - max_age_seconds
+        removed = 0
+        for directory in (self.session_journal_dir, self.session_dir):
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
     
     def save_user_profile(self, user_id, profile):
         """Save user profile"""
@@ -78,8 +284,34 @@ class DataManager:
             'preferences': []
         })
     
+    def save_session_snapshot(self, session_id, payload):
+        """Store a serialized idle session"""
+        path = self._session_path(session_id)
+        with span("data.session_spill"), open(path + ".tmp", 'wb') as f:
+            f.write(payload)
+        os.replace(path + ".tmp", path)
+    
+    def load_session_snapshot(self, session_id):
+        """Load a serialized session, or None if there is none"""
+        try:
+            f = open(self._session_path(session_id), 'rb')
+        except FileNotFoundError:
+            return None
+        with f, span("data.session_rehydrate"):
+            return f.read()
+    
+    def delete_session_snapshot(self, session_id):
+        """Remove a stored session"""
+        try:
+            os.remove(self._session_path(session_id))
+        except FileNotFoundError:
+            pass
+    
+    @timed("data.export_user_data")
     def export_user_data(self, user_id):
         """Export all user data as CSV"""
+        import pandas as pd
+        
         mood_data = self.load_mood_history(user_id)
         journal_data = self.load_journal_entries(user_id)
         
@@ -99,13 +331,269 @@ class DataManager:
     
     def _load_json(self, filepath):
         """Load JSON data from file"""
+        # A missing file is expected and opened outside the span; a corrupt
+        # one still counts as a failed load
+        try:
+            f = open(filepath, 'r')
+        except FileNotFoundError:
+            return {}
         try:
-            with open(filepath, 'r') as f:
+            with f, span("data.json_load"):
                 return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+        except json.JSONDecodeError:
             return {}
     
-    def _save_json(self, filepath, data):
+    def _save_json(self, filepath, data, indent=2):
         """Save data to JSON file"""
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
\ No newline at end of file
+        with span("data.json_save"), open(filepath, 'w') as f:
+            json.dump(data, f, indent=indent, default=str)
+    
+    def _load_rollups(self, mood_data=None):
+        """Cached rollups, brought up to date with the snapshot and delta log.
+        
+        Callers hold _rollup_lock. The snapshot is reloaded only if it was
+        rewritten (e.g. by another process); otherwise just the log lines
+        appended since the last call are applied. mood_data saves a reload
+        of mood_data.json when the rollups have to be built from scratch.
+        """
+        stamp = self._file_stamp(self.rollup_file)
+        if self._rollups is None or stamp != self._rollups_stamp:
+            stored = self._load_json(self.rollup_file) if stamp is not None else {}
+            if 'generation' not in stored:
+                # No snapshot yet: build the rollups from the existing history
+                with span("data.rollup_rebuild"):
+                    history = mood_data if mood_data is not None else self._load_json(self.mood_file)
+                    rollups = MoodRollups.from_history(history)
+                self._save_rollups(rollups)
+                return rollups
+            
+            with span("data.rollup_load"):
+                self._rollups = MoodRollups.from_dict(stored['users'])
+            self._rollups_stamp = stamp
+            self._rollup_generation = stored['generation']
+            self._rollup_log_position = 0
+        
+        self._replay_rollup_log()
+        return self._rollups
+    
+    def _record_rollup_delta(self, user_id, mood_entry):
+        """Fold a saved entry into the rollups by appending one line to the delta log.
+        
+        Callers hold _rollup_lock and have loaded the rollups. The snapshot
+        is only rewritten once the log outgrows ROLLUP_LOG_MAX_BYTES.
+        """
+        with span("data.rollup_update"):
+            delta = [user_id, mood_entry['date'], mood_entry['score'], mood_entry['mood']]
+            with open(self._rollup_log_path(self._rollup_generation), 'a') as f:
+                f.write(json.dumps(delta, default=str) + "\n")
+            self._replay_rollup_log()
+        if self._rollup_log_position > self.ROLLUP_LOG_MAX_BYTES:
+            with span("data.rollup_compact"):
+                self._save_rollups(self._rollups)
+    
+    def _replay_rollup_log(self):
+        """Apply the complete delta log lines written since the last replay"""
+        try:
+            f = open(self._rollup_log_path(self._rollup_generation), 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(self._rollup_log_position)
+            chunk = f.read()
+        # A line still being written by another process is picked up next time
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].splitlines():
+            user_id, date, score, mood = json.loads(line)
+            self._rollups.add(user_id, {'date': date, 'score': score, 'mood': mood})
+        self._rollup_log_position += end
+    
+    def _save_rollups(self, rollups):
+        """Write a rollup snapshot under a new generation and start an empty delta log"""
+        generation = uuid.uuid4().hex
+        tmp_path = self.rollup_file + ".tmp"
+        self._save_json(tmp_path, {'generation': generation, 'users': rollups.to_dict()}, indent=None)
+        os.replace(tmp_path, self.rollup_file)
+        
+        # Logs of earlier generations are folded into the snapshot
+        for name in os.listdir(self.data_dir):
+            if name.startswith("mood_rollups.") and name.endswith(".log"):
+                try:
+                    os.remove(os.path.join(self.data_dir, name))
+                except FileNotFoundError:
+                    pass
+        
+        self._rollups = rollups
+        self._rollups_stamp = self._file_stamp(self.rollup_file)
+        self._rollup_generation = generation
+        self._rollup_log_position = 0
+    
+    def _rollup_log_path(self, generation):
+        """Delta log holding saves made after the snapshot of a generation"""
+        return os.path.join(self.data_dir, f"mood_rollups.{generation}.log")
+    
+    @staticmethod
+    def _file_stamp(path):
+        """(mtime, size) of a file, or None if it does not exist"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _journal_path(self, user_id):
+        """Per-user journal file, one JSON entry per line in date order"""
+        return self._journal_stem(user_id) + ".jsonl"
+    
+    def _journal_index_path(self, user_id):
+        """Per-user journal search index file"""
+        return self._journal_stem(user_id) + ".index.json"
+    
+    def _journal_index_log_path(self, user_id):
+        """Entries indexed since the user's index file was last written"""
+        return self._journal_stem(user_id) + ".index.log"
+    
+    def _journal_stem(self, user_id):
+        """Path shared by a user's journal files, without extension"""
+        user_id = str(user_id)
+        if user_id.startswith(self.SESSION_USER_PREFIX):
+            return os.path.join(self.session_journal_dir,
+                                quote(user_id[len(self.SESSION_USER_PREFIX):], safe=''))
+        return os.path.join(self.journal_dir, quote(user_id, safe=''))
+    
+    def _log_journal_index_entry(self, user_id, entry, offset):
+        """Append a saved entry's searchable fields to the user's index log.
+        
+        Callers hold _journal_lock. Once the log outgrows
+        JOURNAL_INDEX_LOG_MAX_BYTES it is folded into the index file.
+        Entries without an ID are not logged; the index is rebuilt instead.
+        """
+        if 'id' not in entry:
+            return
+        record = [entry['id'], offset, entry.get('title', ""), entry.get('content', ""), entry.get('tags') or []]
+        with span("data.journal_index_log"), open(self._journal_index_log_path(user_id), 'a') as f:
+            f.write(json.dumps(record, default=str) + "\n")
+            log_size = f.tell()
+        if log_size > self.JOURNAL_INDEX_LOG_MAX_BYTES:
+            with span("data.journal_index_compact"):
+                self.save_journal_index(user_id, self.load_journal_index(user_id))
+    
+    def _read_journal_index_log(self, user_id):
+        """Records of the user's index log; a partly written last line is skipped"""
+        try:
+            with open(self._journal_index_log_path(user_id), 'rb') as f:
+                chunk = f.read()
+        except FileNotFoundError:
+            return []
+        return [json.loads(line) for line in chunk[:chunk.rfind(b'\n') + 1].splitlines() if line.strip()]
+    
+    def _session_path(self, session_id):
+        """File holding a spilled session"""
+        return os.path.join(self.session_dir, f"{quote(str(session_id), safe='')}.pkl")
+    
+    def _migrate_legacy_journal(self, user_id, path):
+        """Move a user's entries from journal_entries.json to their own file"""
+        if os.path.exists(path):
+            return
+        data = self._load_json(self.journal_file)
+        if user_id not in data:
+            return
+        
+        entries = sorted(data.pop(user_id), key=self._entry_date)
+        with open(path, 'w') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + "\n")
+        self._save_json(self.journal_file, data)
+    
+    @staticmethod
+    def _entry_date(entry):
+        """Entry date as a datetime, for ordering"""
+        date = entry['date']
+        return datetime.fromisoformat(date) if isinstance(date, str) else date
+    
+    @staticmethod
+    def _decode_journal_line(line):
+        """Parse a stored journal line, restoring the datetime"""
+        entry = json.loads(line)
+        if isinstance(entry['date'], str):
+            entry['date'] = datetime.fromisoformat(entry['date'])
+        return entry
+    
+    @staticmethod
+    def _read_journal_lines(path):
+        """All non-empty lines of a journal file"""
+        try:
+            with open(path, 'r') as f:
+                return [line if line.endswith("\n") else line + "\n" for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+    
+    @staticmethod
+    def _iter_journal_lines(path):
+        """(byte offset, line) for each non-empty line of a journal file"""
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    yield offset, line
+                offset += len(line)
+    
+    @staticmethod
+    def _delete_files(*paths):
+        """Remove files, ignoring ones that do not exist"""
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    @staticmethod
+    def _count_journal_lines(path, block_size=1 << 16):
+        """Number of entries in a journal file, counted without parsing them"""
+        count = 0
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(block_size), b''):
+                    count += block.count(b'\n')
+        except FileNotFoundError:
+            pass
+        return count
+    
+    @staticmethod
+    def _read_journal_lines_backwards(path, end, limit, block_size=8192):
+        """Read up to limit lines ending before byte offset end, last line first.
+        
+        Returns (lines, start offset of the earliest line read, or None when
+        the start of the file was reached).
+        """
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return [], None
+        
+        with f:
+            if end is None:
+                end = os.fstat(f.fileno()).st_size
+            position = end      # file offset of buffer[0]
+            buffer = b''        # unparsed bytes [position, lines_start)
+            lines_start = end   # offset of the earliest line returned so far
+            lines = []
+            while len(lines) < limit and lines_start > 0:
+                newline = buffer.rfind(b'\n', 0, max(len(buffer) - 1, 0))
+                if newline == -1 and position > 0:
+                    read_size = min(block_size, position)
+                    position -= read_size
+                    f.seek(position)
+                    buffer = f.read(read_size) + buffer
+                    continue
+                
+                line = buffer[newline + 1:]
+                buffer = buffer[:newline + 1]
+                lines_start = position + newline + 1
+                if line.strip():
+                    lines.append(line.decode())
+        
+        return lines, (lines_start if lines_start > 0 else None)
@@ -0,0 +1,56 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class InferenceError(Exception):
+    """Raised when the inference service rejects or fails a request"""
+
+
+class InferenceClient:
+    """Thread-safe client for utils.inference_service with pooled connections.
+
+    One instance is meant to be shared by every session in a process so
+    requests reuse keep-alive connections instead of opening new ones.
+    """
+
+    def __init__(self, base_url, pool_size=16, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=1)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def analyze_audio(self, audio_bytes):
+        """Return (mood, confidence, scores) for encoded audio"""
+        result = self._post('/analyze/audio', data=audio_bytes,
+                            headers={'Content-Type': 'application/octet-stream'})
+        return result['mood'], result['confidence'], result['scores']
+
+    def analyze_text(self, text):
+        """Return the TextMoodAnalyzer result dict for text"""
+        return self._post('/analyze/text', json={'text': text})
+
+    def healthy(self):
+        """Whether the service answers its health check"""
+        try:
+            return self.session.get(f"{self.base_url}/healthz", timeout=2).ok
+        except requests.RequestException:
+            return False
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+    def _post(self, path, **kwargs):
+        try:
+            response = self.session.post(f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise InferenceError(f"Inference service unavailable: {e}") from e
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        if not response.ok:
+            raise InferenceError(payload.get('error') or f"HTTP {response.status_code}")
+        return payload
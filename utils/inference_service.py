@@ -0,0 +1,266 @@
+"""Standalone mood inference service.
+
+A dependency-free ASGI app exposing the analyzers over HTTP, so Streamlit
+workers can share one process holding librosa and the models instead of
+loading them each. Concurrent requests are gathered into micro-batches
+and analyzed together.
+
+    uvicorn utils.inference_service:app --port 8502
+
+Endpoints:
+    POST /analyze/audio  raw audio bytes (any format librosa can decode)
+    POST /analyze/text   JSON {"text": "..."}
+    GET  /healthz        liveness check
+    GET  /stats          batching statistics
+
+Batching is tuned with MINDVOICE_MAX_BATCH_SIZE (default 8) and
+MINDVOICE_MAX_WAIT_MS (default 10). Each endpoint queues at most
+MINDVOICE_MAX_QUEUE (default 256) requests; beyond that it answers 503.
+"""
+import asyncio
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.resources import get_audio_analyzer, get_text_analyzer
+from utils.serialization import to_builtin
+
+
+class QueueFull(Exception):
+    """Raised by MicroBatcher.submit when the queue is at capacity"""
+
+
+class MicroBatcher:
+    """Collects concurrent requests into batches for a batch handler.
+
+    A batch is dispatched when it reaches max_batch_size or when the oldest
+    request in it has waited max_wait_ms, whichever comes first. The
+    handler receives a list of items and must return a list of results in
+    the same order; it runs in executor so the event loop stays free. At
+    most max_queue_size items wait; submit raises QueueFull beyond that.
+    """
+
+    def __init__(self, handler, max_batch_size=8, max_wait_ms=10, executor=None, max_queue_size=256):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self.max_queue_size = max_queue_size
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        """Start the dispatch loop on the running event loop"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop dispatching new batches"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, item):
+        """Queue an item and wait for its result; raises QueueFull when overloaded"""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull() from None
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batches += 1
+            self.items += len(batch)
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.handler, items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        """Batch counters for monitoring"""
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'max_queue_size': self.max_queue_size,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0
+        }
+
+
+def analyze_audio_batch(payloads):
+    """Decode audio payloads and classify them in one vectorized pass"""
+    import librosa
+
+    analyzer = get_audio_analyzer()
+    signals, errors = [], []
+    for payload in payloads:
+        try:
+            # librosa.load resamples to a common rate, so clips can be stacked
+            audio_data, sample_rate = librosa.load(io.BytesIO(payload))
+        except Exception as e:
+            signals.append(None)
+            errors.append(f"Could not decode audio: {e}")
+            continue
+        try:
+            analyzer.check_signal(audio_data)
+        except ValueError as e:
+            signals.append(None)
+            errors.append(str(e))
+            continue
+        signals.append(audio_data)
+        errors.append(None)
+
+    decoded = [signal for signal in signals if signal is not None]
+    predictions = iter(analyzer.predict_moods_from_signals(decoded, 22050) if decoded else [])
+
+    results = []
+    for signal, error in zip(signals, errors):
+        if error:
+            results.append({'error': error})
+        else:
+            mood, confidence, scores = next(predictions)
+            results.append({'mood': mood, 'confidence': confidence, 'scores': to_builtin(scores)})
+    return results
+
+
+def analyze_text_batch(texts):
+    """Analyze a batch of texts with the shared TextMoodAnalyzer.
+
+    A text that fails gets an {'error': ...} result without affecting the
+    rest of the batch.
+    """
+    analyzer = get_text_analyzer()
+    results = []
+    for text in texts:
+        try:
+            results.append(to_builtin(analyzer.analyze_text_mood(text)))
+        except Exception as e:
+            results.append({'error': f"Could not analyze text: {e}"})
+    return results
+
+
+class InferenceApp:
+    """ASGI application routing requests to the micro-batchers"""
+
+    def __init__(self, max_batch_size=8, max_wait_ms=10, workers=2, max_queue_size=256):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self.audio_batcher = MicroBatcher(analyze_audio_batch, max_batch_size, max_wait_ms,
+                                          self.executor, max_queue_size)
+        self.text_batcher = MicroBatcher(analyze_text_batch, max_batch_size, max_wait_ms,
+                                         self.executor, max_queue_size)
+        self.started = time.time()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        method, path = scope['method'], scope['path']
+        try:
+            if method == 'GET' and path == '/healthz':
+                await self._respond(send, 200, {'status': 'ok'})
+            elif method == 'GET' and path == '/stats':
+                await self._respond(send, 200, {
+                    'uptime_s': time.time() - self.started,
+                    'audio': self.audio_batcher.stats(),
+                    'text': self.text_batcher.stats()
+                })
+            elif method == 'POST' and path == '/analyze/audio':
+                body = await self._read_body(receive)
+                if not body:
+                    await self._respond(send, 400, {'error': 'Empty audio payload'})
+                    return
+                result = await self.audio_batcher.submit(body)
+                await self._respond(send, 422 if 'error' in result else 200, result)
+            elif method == 'POST' and path == '/analyze/text':
+                try:
+                    text = json.loads(await self._read_body(receive))['text']
+                except (ValueError, KeyError, TypeError):
+                    await self._respond(send, 400, {'error': 'Expected JSON body {"text": ...}'})
+                    return
+                result = await self.text_batcher.submit(str(text))
+                await self._respond(send, 422 if 'error' in result else 200, result)
+            else:
+                await self._respond(send, 404, {'error': 'Not found'})
+        except QueueFull:
+            await self._respond(send, 503, {'error': 'Server busy, retry later'})
+        except Exception as e:
+            print(f"Error handling {method} {path}: {e}")
+            await self._respond(send, 500, {'error': 'Internal error'})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.audio_batcher.start()
+                self.text_batcher.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.audio_batcher.stop()
+                await self.text_batcher.stop()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def _read_body(receive):
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    @staticmethod
+    async def _respond(send, status, payload):
+        body = json.dumps(payload).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode())]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+app = InferenceApp(
+    max_batch_size=int(os.environ.get("MINDVOICE_MAX_BATCH_SIZE", "8")),
+    max_wait_ms=float(os.environ.get("MINDVOICE_MAX_WAIT_MS", "10")),
+    workers=int(os.environ.get("MINDVOICE_INFERENCE_WORKERS", "2")),
+    max_queue_size=int(os.environ.get("MINDVOICE_MAX_QUEUE", "256"))
+)
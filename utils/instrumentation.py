@@ -0,0 +1,178 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# Stage-level timing. Disabled unless MINDVOICE_PROFILE is set (or
+# set_enabled(True) is called); when disabled, span() returns a shared no-op
+# context manager so instrumented code pays only a flag check.
+
+MAX_SAMPLES = 1024  # most recent durations kept per stage for percentiles
+
+_enabled = os.environ.get("MINDVOICE_PROFILE", "").lower() in ("1", "true", "yes", "on")
+_lock = threading.Lock()
+_stages = {}
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+# Modules defining Streamlit's ScriptControlException (st.rerun, st.stop),
+# which is control flow rather than a failed stage. The module moved in
+# later Streamlit releases.
+_SCRIPT_CONTROL_MODULES = (
+    "streamlit.runtime.scriptrunner.exceptions",
+    "streamlit.runtime.scriptrunner_utils.exceptions",
+)
+
+
+def _is_failure(exc_type):
+    """Whether an exception leaving a span means the stage failed"""
+    if exc_type is None:
+        return False
+    for module_name in _SCRIPT_CONTROL_MODULES:
+        # Only already-imported modules: instrumentation must not import Streamlit
+        control = getattr(sys.modules.get(module_name), 'ScriptControlException', None)
+        if control is not None and issubclass(exc_type, control):
+            return False
+    return True
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, (time.perf_counter() - self.start) * 1000, failed=_is_failure(exc_type))
+        return False
+
+
+def is_enabled():
+    """Whether spans are currently recorded"""
+    return _enabled
+
+
+def set_enabled(enabled):
+    """Turn recording on or off for the whole process"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def span(name):
+    """Context manager timing the enclosed block as stage name"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def timed(name):
+    """Decorator timing every call of a function as stage name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record(name, duration_ms, failed=False):
+    """Add one measurement for a stage"""
+    with _lock:
+        stage = _stages.get(name)
+        if stage is None:
+            stage = _stages[name] = {'count': 0, 'errors': 0, 'total_ms': 0.0,
+                                     'max_ms': 0.0, 'samples': deque(maxlen=MAX_SAMPLES)}
+        stage['count'] += 1
+        stage['errors'] += int(failed)
+        stage['total_ms'] += duration_ms
+        stage['max_ms'] = max(stage['max_ms'], duration_ms)
+        stage['samples'].append(duration_ms)
+
+
+def reset():
+    """Forget all measurements"""
+    with _lock:
+        _stages.clear()
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_samples) + 0.5)) - 1, 0)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+
+def stats():
+    """Per-stage summary: count, errors, mean, p50, p95 and max in ms"""
+    with _lock:
+        snapshot = {name: (dict(stage), sorted(stage['samples'])) for name, stage in _stages.items()}
+
+    summary = {}
+    for name, (stage, samples) in sorted(snapshot.items()):
+        summary[name] = {
+            'count': stage['count'],
+            'errors': stage['errors'],
+            'total_ms': stage['total_ms'],
+            'mean_ms': stage['total_ms'] / stage['count'],
+            'p50_ms': percentile(samples, 0.50),
+            'p95_ms': percentile(samples, 0.95),
+            'max_ms': stage['max_ms']
+        }
+    return summary
+
+
+def to_json():
+    """Stage summary as a JSON document"""
+    return json.dumps({'generated': time.time(), 'stages': stats()}, indent=2)
+
+
+def to_prometheus():
+    """Stage summary in the Prometheus text exposition format"""
+    lines = [
+        "# HELP mindvoice_stage_duration_milliseconds Duration of instrumented stages",
+        "# TYPE mindvoice_stage_duration_milliseconds summary"
+    ]
+    error_lines = [
+        "# HELP mindvoice_stage_errors_total Instrumented stages that raised",
+        "# TYPE mindvoice_stage_errors_total counter"
+    ]
+    for name, stage in stats().items():
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'mindvoice_stage_duration_milliseconds{{stage="{label}",quantile="0.5"}} {stage["p50_ms"]:.3f}')
+        lines.append(f'mindvoice_stage_duration_milliseconds{{stage="{label}",quantile="0.95"}} {stage["p95_ms"]:.3f}')
+        lines.append(f'mindvoice_stage_duration_milliseconds_sum{{stage="{label}"}} {stage["total_ms"]:.3f}')
+        lines.append(f'mindvoice_stage_duration_milliseconds_count{{stage="{label}"}} {stage["count"]}')
+        error_lines.append(f'mindvoice_stage_errors_total{{stage="{label}"}} {stage["errors"]}')
+    return "\n".join(lines + error_lines) + "\n"
+
+
+def export(directory):
+    """Write metrics.json and metrics.prom into directory and return their paths"""
+    os.makedirs(directory, exist_ok=True)
+    json_path = os.path.join(directory, "metrics.json")
+    prom_path = os.path.join(directory, "metrics.prom")
+    with open(json_path, 'w') as f:
+        f.write(to_json())
+    with open(prom_path, 'w') as f:
+        f.write(to_prometheus())
+    return json_path, prom_path
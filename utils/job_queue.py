@@ -0,0 +1,109 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """Raised when the analysis pool cannot accept more work"""
+
+
+class AnalysisJobQueue:
+    """Bounded worker pool shared by every session of the app.
+
+    Jobs are identified by an opaque ID so a session can store it in its
+    state and poll for the result on later reruns instead of blocking.
+    """
+
+    def __init__(self, max_workers=4, max_pending=16, result_ttl=600):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="mood-analysis")
+        # One slot per running or queued job; submissions beyond this are rejected
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit a job and return its ID, or raise QueueFullError if saturated"""
+        self._purge_expired()
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("Analysis queue is full, try again shortly")
+
+        job_id = uuid.uuid4().hex
+        job = {'future': None, 'submitted': time.time(), 'finished': None}
+        with self._lock:
+            self._jobs[job_id] = job
+
+        def _on_done(_future):
+            job['finished'] = time.time()
+            self._slots.release()
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except RuntimeError:
+            self._slots.release()
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            raise
+        job['future'] = future
+        future.add_done_callback(_on_done)
+        return job_id
+
+    def status(self, job_id):
+        """Return 'queued', 'running', 'done', 'failed' or 'unknown'"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job['future'] is None:
+            return 'unknown'
+
+        future = job['future']
+        if not future.done():
+            return 'running' if future.running() else 'queued'
+        if future.cancelled() or future.exception() is not None:
+            return 'failed'
+        return 'done'
+
+    def pop_result(self, job_id):
+        """Return the result of a finished job and forget it.
+
+        Re-raises the job's exception if it failed.
+        """
+        with self._lock:
+            job = self._jobs.pop(job_id)
+        return job['future'].result(timeout=0)
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started yet and forget it"""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None and job['future'] is not None:
+            job['future'].cancel()
+
+    def stats(self):
+        """Snapshot of pool utilisation"""
+        with self._lock:
+            futures = [job['future'] for job in self._jobs.values() if job['future'] is not None]
+        running = sum(1 for f in futures if f.running())
+        queued = sum(1 for f in futures if not f.done() and not f.running())
+        return {
+            'running': running,
+            'queued': queued,
+            'finished_uncollected': sum(1 for f in futures if f.done()),
+            'capacity': self.max_workers + self.max_pending
+        }
+
+    def shutdown(self, wait=True):
+        """Stop accepting work and release the worker threads"""
+        self._executor.shutdown(wait=wait)
+
+    def _purge_expired(self):
+        """Drop results nobody collected within result_ttl seconds"""
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job['finished'] is not None and job['finished'] < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
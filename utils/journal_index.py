@@ -0,0 +1,144 @@
+import heapq
+import math
+import re
+
+
+class JournalIndex:
+    """Search index over journal entries.
+
+    Keeps an inverted index from title/content tokens to entry IDs and a
+    tag -> entry IDs index. Both are updated incrementally as entries are
+    added, so searching never rescans the journal. Keyword results are
+    ranked with BM25; title matches count more than content matches.
+    Each entry's byte offset in the journal file, when known, lets hits be
+    read from disk without scanning the journal.
+    """
+
+    TITLE_WEIGHT = 2
+    K1 = 1.2
+    B = 0.75
+    STOP_WORDS = {
+        'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'i', 'if', 'in',
+        'is', 'it', 'me', 'my', 'of', 'on', 'or', 'so', 'that', 'the', 'to', 'was', 'with'
+    }
+
+    def __init__(self):
+        self.postings = {}       # token -> {entry_id: weighted term frequency}
+        self.tag_index = {}      # tag -> set of entry_ids
+        self.doc_lengths = {}    # entry_id -> weighted token count
+        self.entry_tags = {}     # entry_id -> tags, needed to remove entries
+        self.offsets = {}        # entry_id -> byte offset of the entry in the journal
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    @classmethod
+    def tokenize(cls, text):
+        """Lowercase word tokens without stop words"""
+        return [word for word in re.findall(r'\b\w+\b', (text or "").lower())
+                if word not in cls.STOP_WORDS]
+
+    def add_entry(self, entry_id, entry, offset=None):
+        """Index a journal entry's title, content and tags, and where it is stored"""
+        if entry_id in self.doc_lengths:
+            self.remove_entry(entry_id)
+
+        term_freqs = {}
+        for token in self.tokenize(entry.get('title', "")):
+            term_freqs[token] = term_freqs.get(token, 0) + self.TITLE_WEIGHT
+        for token in self.tokenize(entry.get('content', "")):
+            term_freqs[token] = term_freqs.get(token, 0) + 1
+
+        for token, freq in term_freqs.items():
+            self.postings.setdefault(token, {})[entry_id] = freq
+        length = sum(term_freqs.values())
+        self.doc_lengths[entry_id] = length
+        self._total_length += length
+
+        tags = list(entry.get('tags') or [])
+        self.entry_tags[entry_id] = tags
+        for tag in tags:
+            self.tag_index.setdefault(tag, set()).add(entry_id)
+        if offset is not None:
+            self.offsets[entry_id] = offset
+
+    def remove_entry(self, entry_id):
+        """Drop an entry from the index"""
+        length = self.doc_lengths.pop(entry_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        self.offsets.pop(entry_id, None)
+
+        for token in list(self.postings):
+            entries = self.postings[token]
+            if entries.pop(entry_id, None) is not None and not entries:
+                del self.postings[token]
+
+        for tag in self.entry_tags.pop(entry_id, []):
+            tagged = self.tag_index.get(tag)
+            if tagged is not None:
+                tagged.discard(entry_id)
+                if not tagged:
+                    del self.tag_index[tag]
+
+    def search(self, query="", tags=None, limit=20):
+        """Return up to limit (entry_id, score) pairs, best match first.
+
+        Entries must carry every tag in tags. Without a query, matching
+        entries are returned newest first (highest ID) with a score of 0.
+        """
+        candidates = None
+        for tag in tags or []:
+            tagged = self.tag_index.get(tag, set())
+            candidates = set(tagged) if candidates is None else candidates & tagged
+            if not candidates:
+                return []
+
+        tokens = set(self.tokenize(query))
+        if not tokens:
+            if candidates is None:
+                return []
+            return [(entry_id, 0.0) for entry_id in heapq.nlargest(limit, candidates)]
+
+        total_docs = len(self.doc_lengths)
+        avg_length = self._total_length / total_docs if total_docs else 0
+        scores = {}
+        for token in tokens:
+            entries = self.postings.get(token)
+            if not entries:
+                continue
+            idf = math.log(1 + (total_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            for entry_id, freq in entries.items():
+                if candidates is not None and entry_id not in candidates:
+                    continue
+                norm = self.K1 * (1 - self.B + self.B * self.doc_lengths[entry_id] / avg_length)
+                scores[entry_id] = scores.get(entry_id, 0.0) + idf * freq * (self.K1 + 1) / (freq + norm)
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+
+    def to_dict(self):
+        """JSON-serializable representation"""
+        return {
+            'postings': {token: [[entry_id, freq] for entry_id, freq in entries.items()]
+                         for token, entries in self.postings.items()},
+            'doc_lengths': [[entry_id, length] for entry_id, length in self.doc_lengths.items()],
+            'entry_tags': [[entry_id, tags] for entry_id, tags in self.entry_tags.items()],
+            'offsets': [[entry_id, offset] for entry_id, offset in self.offsets.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild an index saved with to_dict"""
+        index = cls()
+        index.postings = {token: {entry_id: freq for entry_id, freq in entries}
+                          for token, entries in data.get('postings', {}).items()}
+        index.doc_lengths = {entry_id: length for entry_id, length in data.get('doc_lengths', [])}
+        index.entry_tags = {entry_id: tags for entry_id, tags in data.get('entry_tags', [])}
+        index.offsets = {entry_id: offset for entry_id, offset in data.get('offsets', [])}
+        index._total_length = sum(index.doc_lengths.values())
+        for entry_id, tags in index.entry_tags.items():
+            for tag in tags:
+                index.tag_index.setdefault(tag, set()).add(entry_id)
+        return index
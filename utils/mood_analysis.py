@@ -1,6 +1,6 @@
-from textblob import TextBlob
 import re
 import numpy as np
+from utils.instrumentation import span, timed
 
 class TextMoodAnalyzer:
     def __init__(self):
@@ -13,15 +13,21 @@ class TextMoodAnalyzer:
             'tired': ['tired', 'exhausted', 'sleepy', 'drained', 'weary', 'fatigue']
         }
     
+    @timed("text.analyze_text_mood")
     def analyze_text_mood(self, text):
         """Comprehensive text mood analysis"""
+        # Imported lazily: TextBlob pulls in nltk on import
+        from textblob import TextBlob
+        
         # Basic sentiment analysis using TextBlob
-        blob = TextBlob(text.lower())
-        polarity = blob.sentiment.polarity  # -1 (negative) to 1 (positive)
-        subjectivity = blob.sentiment.subjectivity  # 0 (objective) to 1 (subjective)
+        with span("text.textblob"):
+            blob = TextBlob(text.lower())
+            polarity = blob.sentiment.polarity  # -1 (negative) to 1 (positive)
+            subjectivity = blob.sentiment.subjectivity  # 0 (objective) to 1 (subjective)
         
         # Keyword-based emotion detection
-        emotion_scores = self._calculate_emotion_scores(text.lower())
+        with span("text.keywords"):
+            emotion_scores = self._calculate_emotion_scores(text.lower())
         
         # Determine primary mood
         primary_mood = self._determine_primary_mood(polarity, emotion_scores)
@@ -104,6 +110,7 @@ class TextMoodAnalyzer:
 
 class MoodInsights:
     @staticmethod
+    @timed("insights.generate_insights")
     def generate_insights(mood_history, journal_entries):
         """Generate personalized insights from mood data"""
         insights = []
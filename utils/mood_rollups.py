@@ -0,0 +1,132 @@
+from datetime import date, datetime, timedelta
+
+# Positions in a rollup row: [count, score_sum, score_min, score_max, {mood: count}]
+COUNT, SUM, MIN, MAX, MOODS = range(5)
+
+
+def day_key(value):
+    """ISO day (YYYY-MM-DD) of a datetime, date or ISO string"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()[:10]
+    return str(value)[:10]
+
+
+class MoodRollups:
+    """Per-user daily mood rollups for cohort queries.
+
+    Each user maps ISO days to a compact row of count, score sum, min and
+    max score and a mood histogram. Rows are updated as entries arrive, so
+    cross-user views scan one small row per user-day instead of every
+    user's full history.
+    """
+
+    def __init__(self, users=None):
+        self.users = users or {}
+
+    @classmethod
+    def from_history(cls, history_by_user):
+        """Build rollups from {user_id: [mood entries]}"""
+        rollups = cls()
+        for user_id, entries in history_by_user.items():
+            for entry in entries:
+                rollups.add(user_id, entry)
+        return rollups
+
+    def add(self, user_id, entry):
+        """Account for a new mood entry of a user"""
+        days = self.users.setdefault(user_id, {})
+        day = day_key(entry['date'])
+        score = entry['score']
+        row = days.get(day)
+        if row is None:
+            days[day] = [1, score, score, score, {entry['mood']: 1}]
+            return
+        row[COUNT] += 1
+        row[SUM] += score
+        row[MIN] = min(row[MIN], score)
+        row[MAX] = max(row[MAX], score)
+        row[MOODS][entry['mood']] = row[MOODS].get(entry['mood'], 0) + 1
+
+    def user_daily(self, user_id):
+        """One user's rollups as {day: {count, average, min, max, moods}}, oldest first"""
+        return {day: self._row_dict(row) for day, row in sorted(self.users.get(user_id, {}).items())}
+
+    def daily_average(self, start=None, end=None):
+        """Average score per day across all users, oldest first.
+
+        start and end are inclusive days. Returns {day: {'average',
+        'entries', 'users'}}.
+        """
+        start = day_key(start) if start is not None else None
+        end = day_key(end) if end is not None else None
+        totals = {}
+        for days in self.users.values():
+            for day, row in days.items():
+                if (start is not None and day < start) or (end is not None and day > end):
+                    continue
+                total = totals.get(day)
+                if total is None:
+                    totals[day] = [row[COUNT], row[SUM], 1]
+                else:
+                    total[0] += row[COUNT]
+                    total[1] += row[SUM]
+                    total[2] += 1
+        return {
+            day: {'average': score_sum / count, 'entries': count, 'users': users}
+            for day, (count, score_sum, users) in sorted(totals.items())
+        }
+
+    def trending_down(self, as_of=None, window_days=7, min_drop=0.5):
+        """Share of users whose mood fell between the last two windows.
+
+        Compares each user's average score over the window_days ending on
+        as_of (default today) with the window_days before it. Only users
+        with entries in both windows count; a user is trending down when
+        the recent average is at least min_drop lower.
+        """
+        as_of = date.fromisoformat(day_key(as_of)) if as_of is not None else date.today()
+        recent_start = (as_of - timedelta(days=window_days - 1)).isoformat()
+        previous_start = (as_of - timedelta(days=2 * window_days - 1)).isoformat()
+        end = as_of.isoformat()
+
+        eligible = down = 0
+        for days in self.users.values():
+            recent = [0, 0]
+            previous = [0, 0]
+            for day, row in days.items():
+                if day > end or day < previous_start:
+                    continue
+                window = recent if day >= recent_start else previous
+                window[0] += row[COUNT]
+                window[1] += row[SUM]
+            if recent[0] and previous[0]:
+                eligible += 1
+                if recent[1] / recent[0] <= previous[1] / previous[0] - min_drop:
+                    down += 1
+
+        return {
+            'users': eligible,
+            'trending_down': down,
+            'share': down / eligible if eligible else 0.0,
+            'as_of': end,
+            'window_days': window_days
+        }
+
+    def to_dict(self):
+        """JSON-serializable form"""
+        return self.users
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore rollups saved with to_dict"""
+        return cls(data)
+
+    @staticmethod
+    def _row_dict(row):
+        return {
+            'count': row[COUNT],
+            'average': row[SUM] / row[COUNT],
+            'min': row[MIN],
+            'max': row[MAX],
+            'moods': dict(row[MOODS])
+        }
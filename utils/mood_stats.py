@@ -0,0 +1,39 @@
+from collections import Counter
+
+
+class MoodAggregates:
+    """Running aggregates over a mood history.
+
+    Updated on every new entry so summary stats can be read in constant
+    time instead of rescanning the whole history on each rerun.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.score_sum = 0
+        self.entries_per_day = Counter()
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build aggregates for an existing history"""
+        aggregates = cls()
+        for entry in entries:
+            aggregates.add(entry)
+        return aggregates
+
+    def add(self, entry):
+        """Account for a new mood entry"""
+        self.count += 1
+        self.score_sum += entry['score']
+        self.entries_per_day[entry['timestamp'].date()] += 1
+
+    @property
+    def average_score(self):
+        """Mean mood score, or None for an empty history"""
+        if not self.count:
+            return None
+        return self.score_sum / self.count
+
+    def entries_on(self, day):
+        """Number of entries recorded on a date"""
+        return self.entries_per_day.get(day, 0)
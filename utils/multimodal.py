@@ -0,0 +1,163 @@
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from utils.instrumentation import span, timed
+
+# How each text emotion spreads over the audio analyzer's mood labels.
+# Anger has no label of its own; it is tense and high-energy.
+TEXT_TO_AUDIO_LABELS = {
+    'happy': {'Happy': 1.0},
+    'sad': {'Sad': 1.0},
+    'angry': {'Anxious': 0.5, 'Energetic': 0.5},
+    'anxious': {'Anxious': 1.0},
+    'calm': {'Calm': 1.0},
+    'tired': {'Tired': 1.0},
+}
+
+
+class MultimodalMoodAnalyzer:
+    """Analyzes a voice recording and its transcript or notes in one call.
+
+    Audio feature extraction runs on a worker thread while the text is
+    analyzed on the calling thread; librosa and NumPy release the GIL in
+    their heavy parts, so the call takes about as long as the slower of
+    the two. The results are fused into one distribution over the audio
+    analyzer's mood labels.
+    """
+
+    def __init__(self, audio_analyzer, text_analyzer, audio_weight=0.6, max_workers=4):
+        self.audio_analyzer = audio_analyzer
+        self.text_analyzer = text_analyzer
+        self.audio_weight = audio_weight
+        self.mood_labels = list(audio_analyzer.mood_labels)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="multimodal")
+
+    @timed("multimodal.analyze")
+    def analyze(self, audio=None, text=None, sample_rate=None):
+        """Analyze audio and/or text and fuse the results.
+
+        audio is either encoded audio bytes or a decoded signal together
+        with its sample_rate. Returns a dict with the fused 'mood',
+        'confidence' and 'scores', the per-modality results under 'audio'
+        and 'text' (None when not given or failed), and 'timings' in ms.
+        """
+        if audio is None and not (text and text.strip()):
+            raise ValueError("Give audio and/or non-empty text to analyze")
+
+        start = time.perf_counter()
+        timings = {}
+        audio_future = None
+        if audio is not None:
+            audio_future = self._executor.submit(self._analyze_audio, audio, sample_rate, timings)
+
+        text_result = None
+        if text and text.strip():
+            text_result = self._analyze_text(text, timings)
+
+        audio_result = audio_future.result() if audio_future is not None else None
+        with span("multimodal.fuse"):
+            result = self.fuse(audio_result, text_result)
+        timings['wall_ms'] = (time.perf_counter() - start) * 1000
+        result.update({'audio': audio_result, 'text': text_result, 'timings': timings})
+        return result
+
+    def fuse(self, audio_result, text_result):
+        """Combine per-modality results into one mood, confidence and score distribution.
+
+        Each modality contributes its distribution weighted by its own
+        confidence; agreement between them raises the fused confidence.
+        """
+        modalities = []
+        if audio_result is not None:
+            modalities.append((self.audio_weight * audio_result['confidence'],
+                               self._normalize(audio_result['scores']), audio_result['confidence']))
+        if text_result is not None:
+            modalities.append(((1 - self.audio_weight) * text_result['confidence'],
+                               self.text_distribution(text_result), text_result['confidence']))
+        if not modalities:
+            return {'mood': None, 'confidence': 0.0, 'scores': {}}
+
+        total_weight = sum(weight for weight, _, _ in modalities)
+        fused = sum(weight * distribution for weight, distribution, _ in modalities) / total_weight
+        mood_index = int(np.argmax(fused))
+
+        # A modality that picked another mood only half-backs the fused one
+        confidence = sum(
+            weight / total_weight * modality_confidence * (1.0 if np.argmax(distribution) == mood_index else 0.5)
+            for weight, distribution, modality_confidence in modalities
+        )
+        return {
+            'mood': self.mood_labels[mood_index],
+            'confidence': min(max(float(confidence), 0.3), 0.95),
+            'scores': dict(zip(self.mood_labels, fused.tolist()))
+        }
+
+    def audio_distribution(self, mood, confidence):
+        """Confidence on the predicted label, the remainder spread evenly over the others"""
+        others = len(self.mood_labels) - 1
+        return {label: confidence if label == mood else (1 - confidence) / others
+                for label in self.mood_labels}
+
+    def text_distribution(self, text_result):
+        """Map a text analysis onto the audio mood labels as a probability vector"""
+        distribution = np.zeros(len(self.mood_labels))
+        for emotion, score in text_result['emotion_scores'].items():
+            for label, share in TEXT_TO_AUDIO_LABELS.get(emotion, {}).items():
+                distribution[self.mood_labels.index(label)] += score * share
+
+        # Sentiment fills in when few emotion keywords matched
+        polarity = text_result['polarity']
+        keyword_mass = distribution.sum()
+        sentiment_mass = max(0.1 - keyword_mass, 0.0) + 0.05
+        if polarity > 0.1:
+            distribution[self.mood_labels.index('Happy')] += sentiment_mass * min(polarity * 2, 1.0)
+        elif polarity < -0.1:
+            distribution[self.mood_labels.index('Sad')] += sentiment_mass * min(-polarity * 2, 1.0)
+        else:
+            distribution[self.mood_labels.index('Calm')] += sentiment_mass * 0.5
+
+        return self._normalize(dict(zip(self.mood_labels, distribution)))
+
+    def shutdown(self, wait=True):
+        """Release the worker threads"""
+        self._executor.shutdown(wait=wait)
+
+    def _analyze_audio(self, audio, sample_rate, timings):
+        start = time.perf_counter()
+        try:
+            if isinstance(audio, (bytes, bytearray)):
+                import librosa
+                with span("audio.decode"):
+                    audio, sample_rate = librosa.load(io.BytesIO(audio))
+            elif sample_rate is None:
+                raise ValueError("sample_rate is required for a decoded signal")
+            # The analyzer's own per-mood scores are random noise around the
+            # prediction, so only its mood and confidence are used
+            mood, confidence, _ = self.audio_analyzer.predict_mood_from_signal(audio, sample_rate)
+            return {'mood': mood, 'confidence': float(confidence),
+                    'scores': self.audio_distribution(mood, float(confidence))}
+        except Exception as e:
+            print(f"Error in audio analysis: {e}")
+            return None
+        finally:
+            timings['audio_ms'] = (time.perf_counter() - start) * 1000
+
+    def _analyze_text(self, text, timings):
+        start = time.perf_counter()
+        try:
+            return self.text_analyzer.analyze_text_mood(text)
+        except Exception as e:
+            print(f"Error in text analysis: {e}")
+            return None
+        finally:
+            timings['text_ms'] = (time.perf_counter() - start) * 1000
+
+    def _normalize(self, scores):
+        """Scores over the mood labels as a vector summing to 1"""
+        values = np.array([max(float(scores.get(label, 0.0)), 0.0) for label in self.mood_labels])
+        total = values.sum()
+        if total <= 0:
+            return np.full(len(self.mood_labels), 1.0 / len(self.mood_labels))
+        return values / total
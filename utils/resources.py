@@ -0,0 +1,55 @@
+import threading
+
+# Process-wide singletons for expensive objects. Each is built on first
+# request and then shared by every session, worker thread and CLI call in
+# the process.
+
+_lock = threading.Lock()
+_instances = {}
+
+
+def _get_or_create(name, factory):
+    """Return the shared instance for name, creating it once"""
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = factory()
+                _instances[name] = instance
+    return instance
+
+
+def get_audio_analyzer():
+    """Shared AudioMoodAnalyzer instance"""
+    def factory():
+        from utils.audio_processing import AudioMoodAnalyzer
+        return AudioMoodAnalyzer()
+    return _get_or_create('audio_analyzer', factory)
+
+
+def get_text_analyzer():
+    """Shared TextMoodAnalyzer instance"""
+    def factory():
+        from utils.mood_analysis import TextMoodAnalyzer
+        return TextMoodAnalyzer()
+    return _get_or_create('text_analyzer', factory)
+
+
+def get_data_manager(data_dir="data"):
+    """Shared DataManager for a data directory"""
+    def factory():
+        from utils.data_manager import DataManager
+        return DataManager(data_dir)
+    return _get_or_create(f'data_manager:{data_dir}', factory)
+
+
+def get_multimodal_analyzer():
+    """Shared MultimodalMoodAnalyzer built on the shared audio and text analyzers"""
+    # Resolved before the factory runs: _lock is held there and is not reentrant
+    audio_analyzer, text_analyzer = get_audio_analyzer(), get_text_analyzer()
+
+    def factory():
+        from utils.multimodal import MultimodalMoodAnalyzer
+        return MultimodalMoodAnalyzer(audio_analyzer, text_analyzer)
+    return _get_or_create('multimodal_analyzer', factory)
@@ -0,0 +1,9 @@
+def to_builtin(value):
+    """Convert numpy scalars and containers into JSON-serializable values"""
+    if isinstance(value, dict):
+        return {key: to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(item) for item in value]
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
@@ -0,0 +1,173 @@
+import pickle
+import threading
+import time
+
+
+class SessionStateManager:
+    """Process-wide home for the large per-session histories.
+
+    Sessions keep only a key in st.session_state and fetch their data
+    through get(). When resident data exceeds the memory budget, or a
+    session has been idle for idle_seconds, its data is pickled to
+    DataManager-backed storage and dropped from memory. The next get()
+    for that session loads it back.
+
+    Keys starting with '_' hold derived caches (e.g. dataframes, search
+    indexes). They are dropped on spill instead of being written to disk.
+    Sessions idle for expire_seconds are forgotten, and on_expire(session_id)
+    is called so other data kept under the session's key can be removed too.
+    """
+
+    def __init__(self, data_manager, memory_budget_bytes=256 * 2**20, idle_seconds=900,
+                 min_idle_seconds=60, expire_seconds=7 * 24 * 3600, check_interval=30, on_expire=None):
+        self.data_manager = data_manager
+        self.memory_budget_bytes = memory_budget_bytes
+        self.idle_seconds = idle_seconds
+        self.min_idle_seconds = min_idle_seconds  # never spill a session used more recently
+        self.expire_seconds = expire_seconds
+        self.check_interval = check_interval
+        self.on_expire = on_expire
+        self._sessions = {}
+        self._lock = threading.RLock()
+        self._last_check = 0.0
+
+    def get(self, session_id, factory):
+        """Resident data dict for a session, rehydrated or created as needed"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = {
+                    'data': None, 'bytes': 0, 'spilled_bytes': 0, 'spilling': False, 'last_access': 0.0
+                }
+            session['last_access'] = time.time()
+            if session['data'] is not None:
+                return session['data']
+            spilled = session['spilled_bytes'] > 0
+
+        # Snapshot I/O happens outside the lock so other sessions are not held up
+        payload = self.data_manager.load_session_snapshot(session_id) if spilled else None
+        data = pickle.loads(payload) if payload else factory()
+        with self._lock:
+            loaded = session['data'] is None
+            if loaded:
+                session['data'] = data
+                session['bytes'] = len(payload) if payload else 0
+                session['spilled_bytes'] = 0
+            data = session['data']
+        if payload and loaded:
+            self.data_manager.delete_session_snapshot(session_id)
+        return data
+
+    def mark_dirty(self, session_id, *added):
+        """Account for objects just added to a session's data.
+
+        Only the added objects are pickled to grow the size estimate, so
+        the cost follows the change rather than the whole history. The
+        estimate is made exact again whenever the session is spilled or
+        rehydrated.
+        """
+        added_bytes = sum(len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)) for value in added)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and session['data'] is not None:
+                session['bytes'] += added_bytes
+
+    def forget(self, session_id):
+        """Drop a session from memory and storage"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None and session['spilled_bytes']:
+            self.data_manager.delete_session_snapshot(session_id)
+
+    def maybe_enforce(self):
+        """Run enforce() at most once per check_interval seconds"""
+        now = time.time()
+        if now - self._last_check < self.check_interval:
+            return []
+        self._last_check = now
+        return self.enforce()
+
+    def enforce(self):
+        """Spill idle sessions, then least recently used ones while over budget.
+
+        Sessions are chosen under the lock; pickling and writing happen
+        outside it. Returns the IDs of the sessions spilled.
+        """
+        now = time.time()
+        expired = []
+        candidates = []
+        with self._lock:
+            for session_id, session in list(self._sessions.items()):
+                if now - session['last_access'] > self.expire_seconds:
+                    del self._sessions[session_id]
+                    expired.append((session_id, session))
+
+            resident = sorted(
+                ((sid, s) for sid, s in self._sessions.items() if s['data'] is not None and not s['spilling']),
+                key=lambda item: item[1]['last_access']
+            )
+            resident_bytes = sum(s['bytes'] for _, s in resident)
+            for session_id, session in resident:
+                idle = now - session['last_access']
+                if idle < self.min_idle_seconds:
+                    break
+                if idle < self.idle_seconds and resident_bytes <= self.memory_budget_bytes:
+                    break
+                resident_bytes -= session['bytes']
+                session['spilling'] = True
+                candidates.append((session_id, session, session['last_access']))
+
+        for session_id, session in expired:
+            if session['spilled_bytes']:
+                self.data_manager.delete_session_snapshot(session_id)
+            if self.on_expire is not None:
+                self.on_expire(session_id)
+
+        return [session_id for session_id, session, last_access in candidates
+                if self._spill(session_id, session, last_access)]
+
+    def stats(self):
+        """Resident vs. spilled session counts and bytes"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        resident = [s for s in sessions if s['data'] is not None]
+        spilled = [s for s in sessions if s['data'] is None]
+        return {
+            'resident_sessions': len(resident),
+            'resident_bytes': sum(s['bytes'] for s in resident),
+            'spilled_sessions': len(spilled),
+            'spilled_bytes': sum(s['spilled_bytes'] for s in spilled),
+            'memory_budget_bytes': self.memory_budget_bytes
+        }
+
+    def _spill(self, session_id, session, last_access):
+        """Write a session to storage and drop it from memory.
+
+        If the session was used while it was being written, it stays
+        resident and the snapshot is discarded. Returns whether it spilled.
+        """
+        try:
+            payload = self._serialize(session['data'])
+            self.data_manager.save_session_snapshot(session_id, payload)
+        except Exception as e:
+            print(f"Error spilling session {session_id}: {e}")
+            with self._lock:
+                session['spilling'] = False
+            return False
+
+        with self._lock:
+            session['spilling'] = False
+            spilled = session['last_access'] == last_access and self._sessions.get(session_id) is session
+            if spilled:
+                session['data'] = None
+                session['spilled_bytes'] = len(payload)
+                session['bytes'] = 0
+        if not spilled:
+            self.data_manager.delete_session_snapshot(session_id)
+        return spilled
+
+    @staticmethod
+    def _serialize(data):
+        """Pickle the persistent part of a session's data"""
+        return pickle.dumps({key: value for key, value in data.items() if not key.startswith('_')},
+                            protocol=pickle.HIGHEST_PROTOCOL)